@@ -35,6 +35,7 @@ class CypherTeam(Team):
                 - 生成/优化cypher语句
                 - 选择一个工具调用
             3. **观察**：分析上一步行动的执行结果
+        - 执行cypher语句之前，先使用 validate_cypher 校验语法和执行计划，修正错误后再执行
         - 持续循环 **思考-行动-观察** 流程，直到：确信可以准确回答用户问题
         - 回答时不要翻译数据库中的原始信息（保持数据库信息原文）\
     """
@@ -119,6 +120,7 @@ class CypherTeam(Team):
                     labels=True,
                     relationships=True,
                     execution=True,
+                    validation=True,
                 ),
             ]
         super().__init__(
@@ -33,7 +33,8 @@ class CypherTreeTeam(Team):
             - 生成/优化的cypher语句
             - 工具调用的结果
         提示：
-        - 在解决问题之前，**映射实体**、**查看元信息**等收集信息的操作是一个好的选择\
+        - 在解决问题之前，**映射实体**、**查看元信息**等收集信息的操作是一个好的选择
+        - 执行cypher语句之前，先使用 validate_cypher 校验语法和执行计划，修正错误后再执行\
     """
     )
     database_dir = "./tmp"
@@ -116,6 +117,7 @@ class CypherTreeTeam(Team):
                     labels=True,
                     relationships=True,
                     execution=True,
+                    validation=True,
                 ),
             ]
         super().__init__(
@@ -24,6 +24,8 @@ class EntitySpecifierAgent(Agent):
         """\
         1. 检查自己能否完成用户任务，如果不能明确提出异议。如果可以，从用户问题中提取实体
         2. 将实体映射到Neo4j数据库中的对应节点/边, 在Neo4j数据库中搜索这些实体的**详细信息**
+            - 提取到多个实体时，使用 get_similar_nodes 一次性映射所有实体，不要逐个查找
+            - 已知实体类型（标签）时，通过 label 参数提供标签提示以缩小检索范围
         3. **详细信息**必须来自数据库，禁止编造虚假信息\
     """
     )
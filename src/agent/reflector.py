@@ -34,6 +34,12 @@ class Reflection(BaseModel):
         return self.score / 10.0
 
 
+class Reflections(BaseModel):
+    reflections: List[Reflection] = Field(
+        description="按候选推理中间状态的顺序给出的反思列表，每个候选对应一条"
+    )
+
+
 class ReflectorAgent(Agent):
     name = ("reflection-agent",)
     system_message = ("你是一个能够对推理中间状态进行反思和评分的AI助手。",)
@@ -54,6 +60,20 @@ class ReflectorAgent(Agent):
             终止：[是/否]\
             """)
 
+    @staticmethod
+    def get_batch_prompt():
+        return dedent("""\
+            请对以下用户问题的多个候选中间推理状态逐一进行反思和评分。
+            这些候选来自同一推理历史的不同扩展，请相互比较后给出评分，更好的候选应得到更高的分数。
+            用户问题：{input}
+            {candidates}
+
+            请按候选的顺序为每个候选提供一条反思，反思数量必须与候选数量({num})一致，每条反思包括：
+            计划：[你的详细分析和下一步计划]
+            评分：[0-10分的评分]
+            终止：[是/否]\
+            """)
+
     def __init__(
         self,
         *,
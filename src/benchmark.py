@@ -0,0 +1,167 @@
+"""Benchmark search strategies by accuracy and LLM calls.
+
+By default the search runs against a simulated workflow whose candidates improve on
+their parent with noise, so strategies and their budgets can be compared on
+thousands of questions without a model or a database:
+
+    python src/benchmark.py --questions 2000 --strategy lats --strategy greedy
+
+With --file the real NL2CypherWorkflow answers the questions of a text file (one per
+line) and the LLM calls, tokens and latency are taken from the budget of each run:
+
+    python src/benchmark.py --file questions.txt --strategy lats
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from agno.utils.log import logger
+
+from agent.reflector import Reflection
+from utils.budget import Budget
+from workflow.strategy import SearchStrategy, get_strategy
+from workflow.tree import Node, TreeState
+
+SOLVED_QUALITY = 0.85
+
+
+class SimulatedWorkflow:
+    """Stands in for NL2CypherWorkflow.aexpand_node with a random model of the search.
+
+    Every node has a hidden quality in [0, 1]. A candidate improves on the quality of
+    its parent by a noisy step that shrinks with the difficulty of the question, the
+    reflection observes the quality with noise and a candidate solves the question
+    once its quality reaches SOLVED_QUALITY. Generating and reflecting a candidate
+    count as two LLM calls; the candidates of one expansion run concurrently, so all
+    of them are paid for even when one of them solves the question.
+    """
+
+    def __init__(self, seed: int, difficulty: float):
+        self.random = random.Random(seed)
+        self.difficulty = difficulty
+        self.quality: Dict[int, float] = {}
+        self.llm_calls = 0
+
+    def reflect(self, quality: float) -> Reflection:
+        observed = min(max(quality + self.random.gauss(0.0, 0.08), 0.0), 1.0)
+        return Reflection(
+            plan="", score=round(observed * 10), end=quality >= SOLVED_QUALITY
+        )
+
+    def initial_response(self) -> Node:
+        self.llm_calls += 2
+        quality = self.random.uniform(0.1, 0.9) * (1 - self.difficulty / 2)
+        root = Node(messages=["0"], reflection=self.reflect(quality=quality))
+        self.quality[id(root)] = quality
+        return root
+
+    async def aexpand_node(self, question, state, node, num) -> List[Node]:
+        children = []
+        for index in range(num):
+            self.llm_calls += 2
+            step = self.random.gauss(0.2 * (1 - self.difficulty), 0.2)
+            quality = min(max(self.quality[id(node)] + step, 0.0), 1.0)
+            child = Node(
+                messages=[f"{node.messages[-1]}.{index}"],
+                parent=node,
+                reflection=self.reflect(quality=quality),
+            )
+            self.quality[id(child)] = quality
+            node.add_child(child)
+            children.append(child)
+        return children
+
+    async def asave_checkpoint(self, state):
+        pass
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    correct: List[bool] = field(default_factory=list)
+    llm_calls: List[int] = field(default_factory=list)
+
+    @property
+    def accuracy(self) -> float:
+        return sum(self.correct) / len(self.correct) if self.correct else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<24} accuracy={self.accuracy:.2%} "
+            f"llm_calls mean={statistics.mean(self.llm_calls):.2f} "
+            f"p90={statistics.quantiles(self.llm_calls, n=10)[-1]:.0f}"
+        )
+
+
+def simulate(name: str, strategy: SearchStrategy, questions: int, seed: int):
+    result = BenchmarkResult(name=name)
+    for index in range(questions):
+        difficulty = random.Random(seed + index).random()
+        workflow = SimulatedWorkflow(seed=seed + index, difficulty=difficulty)
+        state = TreeState(root=workflow.initial_response(), input="问题")
+        state = asyncio.run(
+            strategy.search(workflow=workflow, question="问题", state=state)
+        )
+        solution = strategy.get_solution(state=state)
+        result.correct.append(workflow.quality[id(solution)] >= SOLVED_QUALITY)
+        result.llm_calls.append(workflow.llm_calls)
+    return result
+
+
+def run_workflow(name: str, strategy: SearchStrategy, questions: List[str]):
+    from workflow.nl2cypher import NL2CypherWorkflow
+
+    workflow = NL2CypherWorkflow()
+    for question in questions:
+        budget = Budget()
+        answer = asyncio.run(
+            workflow.asearch(question=question, strategy=strategy, budget=budget)
+        )
+        print(f"[{name}] {question} -> {answer}")
+        print(f"[{name}] {budget.to_dict()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--strategy",
+        action="append",
+        choices=["lats", "beam", "greedy"],
+        help="Strategy to compare, repeat for several (default: all)",
+    )
+    parser.add_argument("--search-depth", type=int, default=5)
+    parser.add_argument("--expand-num", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--file", help="Run the real workflow on these questions")
+    args = parser.parse_args()
+    if not args.file:
+        # Thousands of simulated searches, keep only the summary
+        logger.setLevel(logging.WARNING)
+
+    for name in args.strategy or ["lats", "beam", "greedy"]:
+        strategy = get_strategy(
+            name=name, search_depth=args.search_depth, expand_num=args.expand_num
+        )
+        if args.file:
+            with open(args.file, encoding="utf-8") as f:
+                questions = [line.strip() for line in f if line.strip()]
+            run_workflow(name=name, strategy=strategy, questions=questions)
+        else:
+            print(
+                simulate(
+                    name=name,
+                    strategy=strategy,
+                    questions=args.questions,
+                    seed=args.seed,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from ui.chatui import ChatUI
 from workflow.nl2cypher import NL2CypherWorkflow
 
 if __name__ == "__main__":
-    workflow = NL2CypherWorkflow()
-    chatui = ChatUI(workflow=workflow)
+    chatui = ChatUI(
+        workflow_factory=lambda session_id: NL2CypherWorkflow(session_id=session_id)
+    )
     chatui.run()
@@ -0,0 +1,147 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from haystack import Document as HaystackDocument
+from haystack.components.embedders import OpenAITextEmbedder
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.utils import Secret
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from storage.cache import CacheStats
+from utils.cypher_lexer import string_literals
+
+QDRANT_URL = "http://localhost:6333"
+ANSWER_CACHE_INDEX = "answer_cache"
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    cypher: str
+    answer: str
+    score: float
+
+
+class SemanticAnswerCache:
+    """Question-level cache of solved searches, matched by embedding similarity.
+
+    Each entry stores the solved question, its final Cypher and answer, tagged with
+    the hash of the schema snapshot it was solved against. Lookups only match entries
+    of the current schema, and writing under a new schema drops the stale entries.
+
+    Embedding similarity alone does not tell "哪些主机属于A系统" from "哪些主机属于B系统",
+    so an entry only matches when every string literal of its Cypher appears in the
+    new question.
+    """
+
+    def __init__(
+        self,
+        embed_model_name: str = "m3e-base",
+        embed_base_url: str = "http://localhost:9997/v1",
+        embed_api_key: str = "not_empty",
+        threshold: float = 0.92,
+        candidates: int = 3,
+        embedding_dim: Optional[int] = None,
+        index: str = ANSWER_CACHE_INDEX,
+        url: str = QDRANT_URL,
+    ):
+        self.threshold = threshold
+        self.candidates = candidates
+        self.stats = CacheStats()
+        self.text_embedder = OpenAITextEmbedder(
+            model=embed_model_name,
+            api_base_url=embed_base_url,
+            api_key=Secret.from_token(embed_api_key),
+        )
+        if embedding_dim is None:
+            # The collection's vector size must match the configured embedding model
+            embedding_dim = len(self.text_embedder.run(text=index)["embedding"])
+        self.document_store = QdrantDocumentStore(
+            url=url,
+            index=index,
+            embedding_dim=embedding_dim,
+            recreate_index=False,
+            progress_bar=False,
+        )
+        self._schema_hash: Optional[str] = None
+
+    @staticmethod
+    def make_id(question: str, schema_hash: str) -> str:
+        content = f"{schema_hash}:{question}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def mentions_literals(question: str, cypher: str) -> bool:
+        """Whether every string literal of the Cypher, such as an entity name, is in the question."""
+        return all(literal in question for literal in string_literals(cypher=cypher))
+
+    def get(self, question: str, schema_hash: str) -> Optional[CachedAnswer]:
+        """Return the most similar solved question of the schema above the threshold.
+
+        Of the candidates most similar entries, the first whose Cypher literals all
+        appear in the question matches.
+        """
+        embedding = self.text_embedder.run(text=question)["embedding"]
+        documents = self.document_store._query_by_embedding(
+            query_embedding=embedding,
+            filters={
+                "field": "meta.schema_hash",
+                "operator": "==",
+                "value": schema_hash,
+            },
+            top_k=self.candidates,
+            score_threshold=self.threshold,
+        )
+        documents = [
+            document
+            for document in documents
+            if self.mentions_literals(question=question, cypher=document.meta["cypher"])
+        ]
+        if len(documents) == 0:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        document = documents[0]
+        return CachedAnswer(
+            question=document.content,
+            cypher=document.meta["cypher"],
+            answer=document.meta["answer"],
+            score=document.score,
+        )
+
+    def set(self, question: str, cypher: str, answer: str, schema_hash: str):
+        if schema_hash != self._schema_hash:
+            self.invalidate(schema_hash=schema_hash)
+        embedding = self.text_embedder.run(text=question)["embedding"]
+        document = HaystackDocument(
+            id=self.make_id(question=question, schema_hash=schema_hash),
+            content=question,
+            embedding=embedding,
+            meta={
+                "cypher": cypher,
+                "answer": answer,
+                "schema_hash": schema_hash,
+                "created_at": time.time(),
+            },
+        )
+        self.document_store.write_documents(
+            documents=[document], policy=DuplicatePolicy.OVERWRITE
+        )
+
+    def delete(self, question: str, schema_hash: str):
+        self.document_store.delete_documents(
+            document_ids=[self.make_id(question=question, schema_hash=schema_hash)]
+        )
+
+    def invalidate(self, schema_hash: str):
+        """Drop the entries solved against any other schema snapshot."""
+        self.document_store.delete_by_filter(
+            filters={
+                "field": "meta.schema_hash",
+                "operator": "!=",
+                "value": schema_hash,
+            }
+        )
+        self._schema_hash = schema_hash
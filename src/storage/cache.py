@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from agent.reflector import Reflection
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.hit_rate:.2%} ({self.hits}/{self.lookups})"
+
+
+class ReflectionCache:
+    """Content-addressed cache of reflections keyed by (question, candidate).
+
+    Entries live in an in-memory LRU and, when db_file is given, in a SQLite table
+    shared across processes and restarts. Both layers drop entries older than ttl
+    seconds; the namespace (e.g. the reflector model) is part of the key.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[int] = 7 * 24 * 3600,
+        db_file: Optional[str] = None,
+        table_name: str = "reflection_cache",
+        namespace: str = "",
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_file = db_file
+        self.table_name = table_name
+        self.namespace = namespace
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if db_file is not None:
+            db_dir = os.path.dirname(db_file)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._connection = sqlite3.connect(db_file, check_same_thread=False)
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} "
+                "(key TEXT PRIMARY KEY, reflection TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+
+    def make_key(self, input: str, candidate: str) -> str:
+        content = json.dumps([self.namespace, input, candidate], ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, input: str, candidate: str) -> Optional[Reflection]:
+        key = self.make_key(input=input, candidate=candidate)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(created_at=entry[0], now=now):
+                del self._entries[key]
+                entry = None
+            if entry is None and self._connection is not None:
+                row = self._connection.execute(
+                    f"SELECT created_at, reflection FROM {self.table_name} WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and not self._is_expired(created_at=row[0], now=now):
+                    entry = (row[0], row[1])
+                    self._put(key=key, entry=entry)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+        return Reflection.model_validate_json(entry[1])
+
+    def set(self, input: str, candidate: str, reflection: Reflection):
+        key = self.make_key(input=input, candidate=candidate)
+        entry = (time.time(), reflection.model_dump_json())
+        with self._lock:
+            self._put(key=key, entry=entry)
+            if self._connection is not None:
+                self._connection.execute(
+                    f"INSERT OR REPLACE INTO {self.table_name} (key, reflection, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, entry[1], entry[0]),
+                )
+                if self.ttl is not None:
+                    self._connection.execute(
+                        f"DELETE FROM {self.table_name} WHERE created_at < ?",
+                        (entry[0] - self.ttl,),
+                    )
+                self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute(f"DELETE FROM {self.table_name}")
+                self._connection.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, key: str, entry: Tuple[float, str]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
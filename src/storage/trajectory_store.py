@@ -0,0 +1,105 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from haystack import Document as HaystackDocument
+from haystack.components.embedders import OpenAITextEmbedder
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.utils import Secret
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+QDRANT_URL = "http://localhost:6333"
+TRAJECTORY_INDEX = "solved_trajectories"
+
+
+@dataclass
+class SolvedExample:
+    question: str
+    cypher: str
+    trajectory: List[str]
+    score: float
+
+
+class SolvedTrajectoryStore:
+    """Solved searches indexed by question embedding, used as few-shot examples.
+
+    Every solved search adds its question, final Cypher and winning trajectory,
+    tagged with the hash of the schema snapshot it was solved against; new questions
+    retrieve the nearest solved ones of the current schema above min_score.
+    """
+
+    def __init__(
+        self,
+        embed_model_name: str = "m3e-base",
+        embed_base_url: str = "http://localhost:9997/v1",
+        embed_api_key: str = "not_empty",
+        min_score: float = 0.75,
+        embedding_dim: Optional[int] = None,
+        index: str = TRAJECTORY_INDEX,
+        url: str = QDRANT_URL,
+    ):
+        self.min_score = min_score
+        self.text_embedder = OpenAITextEmbedder(
+            model=embed_model_name,
+            api_base_url=embed_base_url,
+            api_key=Secret.from_token(embed_api_key),
+        )
+        if embedding_dim is None:
+            # The collection's vector size must match the configured embedding model
+            embedding_dim = len(self.text_embedder.run(text=index)["embedding"])
+        self.document_store = QdrantDocumentStore(
+            url=url,
+            index=index,
+            embedding_dim=embedding_dim,
+            recreate_index=False,
+            progress_bar=False,
+        )
+
+    @staticmethod
+    def make_id(question: str, schema_hash: str) -> str:
+        content = f"{schema_hash}:{question}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def add(self, question: str, cypher: str, trajectory: List[str], schema_hash: str):
+        embedding = self.text_embedder.run(text=question)["embedding"]
+        document = HaystackDocument(
+            # A question solved again under the same schema replaces its example
+            id=self.make_id(question=question, schema_hash=schema_hash),
+            content=question,
+            embedding=embedding,
+            meta={
+                "cypher": cypher,
+                "trajectory": trajectory,
+                "schema_hash": schema_hash,
+                "created_at": time.time(),
+            },
+        )
+        self.document_store.write_documents(
+            documents=[document], policy=DuplicatePolicy.OVERWRITE
+        )
+
+    def search(
+        self, question: str, schema_hash: str, top_k: int = 3
+    ) -> List[SolvedExample]:
+        """Return up to top_k solved examples of the schema, most similar first."""
+        embedding = self.text_embedder.run(text=question)["embedding"]
+        documents = self.document_store._query_by_embedding(
+            query_embedding=embedding,
+            filters={
+                "field": "meta.schema_hash",
+                "operator": "==",
+                "value": schema_hash,
+            },
+            top_k=top_k,
+            score_threshold=self.min_score,
+        )
+        return [
+            SolvedExample(
+                question=document.content,
+                cypher=document.meta["cypher"],
+                trajectory=document.meta["trajectory"],
+                score=document.score,
+            )
+            for document in documents
+        ]
@@ -8,8 +8,12 @@ from haystack.components.converters import TextFileToDocument
 from haystack.components.embedders import OpenAIDocumentEmbedder, OpenAITextEmbedder
 from haystack.document_stores.types import DuplicatePolicy
 from haystack.utils import Secret
+from haystack_integrations.components.retrievers.qdrant import QdrantEmbeddingRetriever
 from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
 
+QDRANT_URL = "http://localhost:6333"
+CHEATSHEET_INDEX = "cypher_cheatsheet"
+
 
 class CypherTools(Toolkit):
     name = "Cypher_tools"
@@ -29,6 +33,8 @@ class CypherTools(Toolkit):
         embed_model_name: str = "m3e-base",
         embed_base_url: str = "http://localhost:9997/v1",
         embed_api_key: str = "not_empty",
+        async_search: bool = False,
+        document_store: Optional[QdrantDocumentStore] = None,
     ):
         super().__init__(
             name=name,
@@ -45,14 +51,18 @@ class CypherTools(Toolkit):
         self.embed_model_name = embed_model_name
         self.embed_base_url = embed_base_url
         self.embed_api_key = embed_api_key
-        self.document_store = self.load_knowledge()
+        self.document_store = document_store or self.load_knowledge()
+        self.retriever = QdrantEmbeddingRetriever(document_store=self.document_store)
         self.text_embedder = OpenAITextEmbedder(
             model=embed_model_name,
             api_base_url=embed_base_url,
             api_key=Secret.from_token(embed_api_key),
         )
 
-        self.register(self.seach_cypher_cheatsheet)
+        if async_search:
+            self.register(self.aseach_cypher_cheatsheet, name="seach_cypher_cheatsheet")
+        else:
+            self.register(self.seach_cypher_cheatsheet)
         return
 
     def load_knowledge(self, base_path: str = "./knowledge/") -> QdrantDocumentStore:
@@ -93,7 +103,7 @@ class CypherTools(Toolkit):
         haystack_documents = embedder.run(documents=haystack_documents)["documents"]
 
         document_store = QdrantDocumentStore(
-            recreate_index=False, index="cypher_cheatsheet", url="http://localhost:6333"
+            recreate_index=False, index=CHEATSHEET_INDEX, url=QDRANT_URL
         )
         document_store.write_documents(
             documents=haystack_documents, policy=DuplicatePolicy.SKIP
@@ -112,8 +122,26 @@ class CypherTools(Toolkit):
             str: 用换行符连接的前top-k个匹配的Cypher速查表条目组成的拼接字符串
         """
         query_embedding = self.text_embedder.run(text=query)["embedding"]
-        documents = self.document_store._query_by_embedding(
-            query_embedding=query_embedding, top_k=top_k
-        )
+        documents = self.retriever.run(query_embedding=query_embedding, top_k=top_k)[
+            "documents"
+        ]
+        texts = [document.content for document in documents]
+        return "\n\n".join(texts)
+
+    async def aseach_cypher_cheatsheet(self, query: str, top_k: int = 5) -> str:
+        """
+        根据给定查询检索相关的Cypher知识模板信息。Cypher速查表内容为英文文本，请使用英文进行搜索。
+
+        参数:
+            query (str): 搜索查询字符串
+            top_k (int, 可选): 最大返回相关文档数量，默认为5
+
+        返回:
+            str: 用换行符连接的前top-k个匹配的Cypher速查表条目组成的拼接字符串
+        """
+        query_embedding = (await self.text_embedder.run_async(text=query))["embedding"]
+        documents = (
+            await self.retriever.run_async(query_embedding=query_embedding, top_k=top_k)
+        )["documents"]
         texts = [document.content for document in documents]
         return "\n\n".join(texts)
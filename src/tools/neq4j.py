@@ -1,11 +1,19 @@
+import hashlib
 import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from textwrap import dedent
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from agno.tools import Toolkit
-from agno.utils.log import log_error
+from agno.utils.log import log_debug, log_error
 from graphviz import Digraph
-from haystack.components.embedders import OpenAITextEmbedder
+from haystack import Document as HaystackDocument
+from haystack.components.embedders import OpenAIDocumentEmbedder, OpenAITextEmbedder
 from haystack.utils import Secret
 from neo4j import GraphDatabase, Record, ResultSummary, basic_auth
 from neo4j.exceptions import ClientError, CypherSyntaxError
@@ -15,9 +23,55 @@ from neo4j_haystack.client import Neo4jClient, Neo4jClientConfig
 from neo4j_haystack.client.neo4j_client import DEFAULT_NEO4J_DATABASE
 from tqdm import tqdm
 
+from utils.budget import charge_db_query
+from utils.cypher_lexer import parameterize_cypher
+from utils.cypher_parser import check_cypher
+
+NAME_INDEX = "entity_name_index"
+RRF_K = 60
+FUSION_CANDIDATE_FACTOR = 5
+SCHEMA_HASH_TTL = 60
+
+
+@dataclass
+class QueryMetrics:
+    """工具发出的查询统计。
+
+    执行计划缓存命中数是客户端估计值：按查询文本用同等容量的LRU模拟服务端缓存，
+    不反映其他客户端的查询和服务端的淘汰，不是服务端的真实命中率。
+    """
+
+    queries: int = 0
+    parameterized_queries: int = 0
+    estimated_plan_cache_hits: int = 0
+
+    @property
+    def estimated_plan_cache_hit_rate(self) -> float:
+        if self.queries == 0:
+            return 0.0
+        return self.estimated_plan_cache_hits / self.queries
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "estimated_plan_cache_hit_rate": self.estimated_plan_cache_hit_rate,
+        }
+
+
+class NodeHit(NamedTuple):
+    element_id: str
+    node: Dict[str, Any]
+    score: float
+    labels: List[str]
+
 
 class Neo4jTools(Toolkit):
     name = "neo4j_tools"
+    # 同一数据库的所有工具实例共享的缓存，每个团队新建工具实例时不必重新查询索引、嵌入标签名。
+    # 键以数据库地址和名称开头，值带有计算时的模式哈希，模式变化后重新计算
+    _shared_cache: Dict[Tuple[str, ...], Tuple[str, Any]] = {}
+    _shared_schema_hashes: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    _shared_lock = threading.Lock()
 
     def __init__(
         self,
@@ -37,6 +91,11 @@ class Neo4jTools(Toolkit):
         embed_model_name: str = "m3e-base",
         embed_base_url: str = "http://localhost:9997/v1",
         embed_api_key: str = "not_empty",
+        similar_top_k: int = 1,
+        label_route_num: int = 3,
+        parameterize: bool = False,
+        plan_cache_size: int = 1000,
+        offline_validation: bool = True,
         db_uri: Optional[str] = None,
         dialect: Optional[str] = None,
         host: Optional[str] = None,
@@ -46,6 +105,7 @@ class Neo4jTools(Toolkit):
         relationships: bool = False,
         similar_nodes: bool = False,
         execution: bool = False,
+        validation: bool = False,
     ):
         super().__init__(
             name=name,
@@ -67,6 +127,15 @@ class Neo4jTools(Toolkit):
         self.dialect = dialect
         self.host = host
         self.port = port
+        self.similar_top_k = similar_top_k
+        self.label_route_num = label_route_num
+        self.parameterize = parameterize
+        self.plan_cache_size = plan_cache_size
+        self.offline_validation = offline_validation
+        self.metrics = QueryMetrics()
+        self._planned_queries: OrderedDict[str, None] = OrderedDict()
+        # _record_query runs in asyncio.to_thread workers
+        self._metrics_lock = threading.Lock()
 
         self._driver = GraphDatabase.driver(uri=db_uri, auth=basic_auth(user, password))
         self._driver.verify_connectivity()
@@ -85,6 +154,12 @@ class Neo4jTools(Toolkit):
             api_base_url=embed_base_url,
             api_key=Secret.from_token(embed_api_key),
         )
+        self.document_embedder = OpenAIDocumentEmbedder(
+            model=embed_model_name,
+            api_base_url=embed_base_url,
+            api_key=Secret.from_token(embed_api_key),
+            progress_bar=False,
+        )
 
         if schema:
             self.register(self.show_schema)
@@ -94,6 +169,9 @@ class Neo4jTools(Toolkit):
             self.register(self.show_relationships)
         if similar_nodes:
             self.register(self.get_similar_node)
+            self.register(self.get_similar_nodes)
+        if validation:
+            self.register(self.validate_cypher)
         if execution:
             self.register(self.execute_cypher)
 
@@ -103,18 +181,71 @@ class Neo4jTools(Toolkit):
 
     def show_labels(self) -> str:
         """显示Neo4j数据库中的所有标签。"""
+        charge_db_query()
         labels, _, _ = self._execute_cypher("""CALL db.labels() """)
         labels = [label["label"] for label in labels]
         return f"Node labels:{labels}"
 
     def show_relationships(self) -> str:
         """显示Neo4j数据库中的所有关系。"""
+        charge_db_query()
         relationships, _, _ = self._execute_cypher(cypher="CALL db.relationshipTypes()")
         relationships = [
             relationship["relationshipType"] for relationship in relationships
         ]
         return f"Relationship:{relationships}"
 
+    def get_schema_hash(self) -> str:
+        """计算数据库模式快照（标签、关系类型和属性键）的哈希值，模式变化后哈希值随之变化。
+
+        返回:
+            str: 模式快照的sha256值，同一数据库的工具实例在SCHEMA_HASH_TTL秒内复用上次的结果
+        """
+        now = time.monotonic()
+        key = (self.db_uri, self.database)
+        with self._shared_lock:
+            cached = self._shared_schema_hashes.get(key)
+        if cached is not None and now - cached[0] < SCHEMA_HASH_TTL:
+            return cached[1]
+        labels, _, _ = self._execute_cypher(cypher="CALL db.labels()")
+        relationships, _, _ = self._execute_cypher(cypher="CALL db.relationshipTypes()")
+        property_keys, _, _ = self._execute_cypher(cypher="CALL db.propertyKeys()")
+        snapshot = {
+            "labels": sorted(label["label"] for label in labels),
+            "relationships": sorted(
+                relationship["relationshipType"] for relationship in relationships
+            ),
+            "property_keys": sorted(
+                property_key["propertyKey"] for property_key in property_keys
+            ),
+        }
+        schema_hash = hashlib.sha256(
+            json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        with self._shared_lock:
+            self._shared_schema_hashes[key] = (now, schema_hash)
+        return schema_hash
+
+    def _get_shared(self, name: str, compute: Callable[[], Any]) -> Any:
+        """从同一数据库共享的缓存中取值，不存在或模式哈希已变化时调用compute重新计算。"""
+        schema_hash = self.get_schema_hash()
+        key = (self.db_uri, self.database, name)
+        with self._shared_lock:
+            cached = self._shared_cache.get(key)
+        if cached is not None and cached[0] == schema_hash:
+            return cached[1]
+        value = compute()
+        with self._shared_lock:
+            self._shared_cache[key] = (schema_hash, value)
+        return value
+
+    def _clear_shared(self):
+        with self._shared_lock:
+            for key in list(self._shared_cache):
+                if key[:2] == (self.db_uri, self.database):
+                    del self._shared_cache[key]
+            self._shared_schema_hashes.pop((self.db_uri, self.database), None)
+
     def embed_nodes(self):
         _, records = self._neo4j_client.execute_read(query="MATCH (n) RETURN n")
         for record in tqdm(records, desc="embedding"):
@@ -129,45 +260,381 @@ class Neo4jTools(Toolkit):
         labels = [label["label"] for label in labels]
         for label in labels:
             self._neo4j_client.create_index_if_missing(
-                index_name=f"index_{label}",
+                index_name=self._get_label_index_name(label=label),
                 label=label,
                 property_key="embedding",
                 dimension=len(embedding),
                 similarity_function="cosine",
             )
+
+        property_keys, _, _ = self._execute_cypher("""CALL db.propertyKeys() """)
+        name_keys = [
+            property_key["propertyKey"]
+            for property_key in property_keys
+            if self._is_name_key(property_key["propertyKey"])
+        ]
+        if len(labels) > 0 and len(name_keys) > 0:
+            label_expression = "|".join(f"`{label}`" for label in labels)
+            properties_expression = ", ".join(f"n.`{key}`" for key in name_keys)
+            self._neo4j_client.execute_write(
+                query=f"CREATE FULLTEXT INDEX {NAME_INDEX} IF NOT EXISTS "
+                f"FOR (n:{label_expression}) ON EACH [{properties_expression}]"
+            )
+        self._clear_shared()
         return
 
-    def get_similar_node(self, query: str) -> str:
+    def get_similar_node(
+        self, query: str, label: Optional[str] = None, top_k: Optional[int] = None
+    ) -> str:
         """使用该函数查找与给定查询相似的节点。
 
         参数:
             query (str): 用于查找相似节点的查询字符串
+            label (str, 可选): 节点标签提示，已知实体类型时填写可缩小检索范围
+            top_k (int, 可选): 返回的最相似节点数量，默认使用工具配置的数量
 
         返回:
             str: JSON格式字符串，包含按相关性排序的最相似节点
         """
-        top_k = 1
-        indexs = self._get_indexs(keys_to_keep=["name", "type"])
-        index_names = [index["name"] for index in indexs if index["type"] == "VECTOR"]
+        charge_db_query()
+        top_k = top_k or self.similar_top_k
+        try:
+            similar_nodes = self._search_similar_nodes(
+                queries=[query], top_k=top_k, label=label
+            )[0]
+        except ClientError as e:
+            log_error(e.message)
+            return e.message
+        formatted_records, _, _ = self._format_record_json(data=similar_nodes)
+        return json.dumps(obj=formatted_records, ensure_ascii=False, indent=2)
 
-        query_embedding = self.text_embedder.run(text=query)["embedding"]
+    def get_similar_nodes(
+        self,
+        queries: List[str],
+        label: Optional[str] = None,
+        top_k: Optional[int] = None,
+    ) -> str:
+        """使用该函数一次性查找与多个查询相似的节点。问题中包含多个实体时，优先使用该函数批量映射。
 
-        records = []
-        for index_name in index_names:
-            try:
-                records.extend(
-                    self._neo4j_client.query_embeddings(
-                        index=index_name,
-                        top_k=top_k,
-                        embedding=query_embedding,
-                    )
+        参数:
+            queries (List[str]): 用于查找相似节点的查询字符串列表
+            label (str, 可选): 节点标签提示，所有查询属于同一实体类型时填写
+            top_k (int, 可选): 每个查询返回的最相似节点数量，默认使用工具配置的数量
+
+        返回:
+            str: JSON格式字符串，键为查询字符串，值为按相关性排序的最相似节点
+        """
+        if len(queries) == 0:
+            return "{}"
+        charge_db_query()
+        top_k = top_k or self.similar_top_k
+        try:
+            similar_nodes = self._search_similar_nodes(
+                queries=queries, top_k=top_k, label=label
+            )
+        except ClientError as e:
+            log_error(e.message)
+            return e.message
+
+        formatted_similar_nodes = {}
+        for query, nodes in zip(queries, similar_nodes):
+            formatted_records, _, _ = self._format_record_json(data=nodes)
+            formatted_similar_nodes[query] = formatted_records
+        return json.dumps(obj=formatted_similar_nodes, ensure_ascii=False, indent=2)
+
+    def _search_similar_nodes(
+        self, queries: List[str], top_k: int, label: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """对每个查询进行全文+向量的混合检索，并使用RRF融合两路结果。
+
+        全文检索命中名称完全相同的节点时直接返回（精确匹配短路），
+        所有查询都精确命中时不会调用嵌入模型。向量检索只查询路由到的少数标签索引。
+
+        参数:
+            queries (List[str]): 查询字符串列表
+            top_k (int): 每个查询返回的节点数量
+            label (str, 可选): 标签提示，为空时根据全文命中和标签名嵌入推断
+
+        返回:
+            List[List[Dict[str, Any]]]: 与queries一一对应的节点列表，节点中的score为融合分数
+        """
+        fulltext_hits = self._query_fulltext_nodes(
+            queries=queries, limit=top_k * FUSION_CANDIDATE_FACTOR
+        )
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        pending = []
+        for i, query in enumerate(queries):
+            exact_hits = [
+                hit.node
+                for hit in fulltext_hits.get(i, [])
+                if self._is_exact_match(node=hit.node, query=query)
+            ]
+            if len(exact_hits) > 0:
+                results[i] = [{**node, "score": 1.0} for node in exact_hits[:top_k]]
+            else:
+                pending.append(i)
+        if len(pending) == 0:
+            return results
+
+        documents = self.document_embedder.run(
+            documents=[HaystackDocument(content=queries[i]) for i in pending]
+        )["documents"]
+        embeddings = [document.embedding for document in documents]
+        index_names = [
+            [
+                self._get_label_index_name(label=routed_label)
+                for routed_label in self._route_labels(
+                    embedding=embedding,
+                    fulltext_hits=fulltext_hits.get(i, []),
+                    label=label,
                 )
-            except ClientError as e:
-                log_error(e.message)
-                continue
-        sorted_records = sorted(records, key=lambda x: x["score"], reverse=True)[:top_k]
-        formatted_records, _, _ = self._format_record_json(data=sorted_records)
-        return json.dumps(obj=formatted_records, ensure_ascii=False, indent=2)
+            ]
+            for i, embedding in zip(pending, embeddings)
+        ]
+        vector_hits = self._query_vector_nodes(
+            embeddings=embeddings,
+            index_names=index_names,
+            top_k=top_k * FUSION_CANDIDATE_FACTOR,
+        )
+        for j, i in enumerate(pending):
+            results[i] = self._fuse_hits(
+                ranked_lists=[fulltext_hits.get(i, []), vector_hits.get(j, [])],
+                top_k=top_k,
+            )
+        return results
+
+    def _route_labels(
+        self,
+        embedding: List[float],
+        fulltext_hits: List[NodeHit],
+        label: Optional[str] = None,
+    ) -> List[str]:
+        """选择需要进行向量检索的标签。
+
+        优先使用标签提示；否则依次取全文命中节点的标签、与查询嵌入最相近的标签名，
+        最多取 label_route_num 个，使单次检索的索引数量与标签总数无关。
+        """
+        vector_labels = self._get_vector_labels()
+        if label is not None and label in vector_labels:
+            return [label]
+
+        routed_labels: List[str] = []
+        for hit in fulltext_hits:
+            for hit_label in hit.labels:
+                if hit_label in vector_labels and hit_label not in routed_labels:
+                    routed_labels.append(hit_label)
+        if len(routed_labels) < self.label_route_num:
+            label_embeddings = self._get_label_embeddings()
+            ranked_labels = sorted(
+                label_embeddings,
+                key=lambda candidate: self._cosine_similarity(
+                    embedding, label_embeddings[candidate]
+                ),
+                reverse=True,
+            )
+            for ranked_label in ranked_labels:
+                if ranked_label not in routed_labels:
+                    routed_labels.append(ranked_label)
+        return routed_labels[: self.label_route_num]
+
+    def _get_vector_labels(self) -> List[str]:
+        prefix = "index_"
+        return [
+            index_name[len(prefix) :]
+            for index_name in self._get_vector_index_names()
+            if index_name.startswith(prefix)
+        ]
+
+    @staticmethod
+    def _get_label_index_name(label: str) -> str:
+        return f"index_{label}"
+
+    def _get_label_embeddings(self) -> Dict[str, List[float]]:
+        """标签名嵌入，同一数据库和嵌入模型只批量计算一次，模式变化后重新计算。"""
+
+        def _embed_labels() -> Dict[str, List[float]]:
+            labels = self._get_vector_labels()
+            documents = self.document_embedder.run(
+                documents=[HaystackDocument(content=label) for label in labels]
+            )["documents"]
+            return {
+                label: document.embedding for label, document in zip(labels, documents)
+            }
+
+        return self._get_shared(
+            name=f"label_embeddings:{self.document_embedder.model}",
+            compute=_embed_labels,
+        )
+
+    @staticmethod
+    def _cosine_similarity(a: List[float], b: List[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm > 0 else 0.0
+
+    def _query_fulltext_nodes(
+        self, queries: List[str], limit: int
+    ) -> Dict[int, List[NodeHit]]:
+        """在实体名称全文索引中批量检索，索引不存在时返回空结果。"""
+        try:
+            return self._fulltext_hits(queries=queries, limit=limit)
+        except ClientError as e:
+            log_error(e.message)
+            return {}
+
+    def _fulltext_hits(
+        self, queries: List[str], limit: int
+    ) -> Dict[int, List[NodeHit]]:
+        records, _, _ = self._run_query(
+            query=dedent("""\
+                UNWIND range(0, size($queries) - 1) AS i
+                CALL db.index.fulltext.queryNodes($index, $queries[i], {limit: $limit})
+                YIELD node, score
+                RETURN i, elementId(node) AS element_id, labels(node) AS labels,
+                       node {.*, embedding: null} AS node, score\
+                """),
+            parameters={
+                "index": NAME_INDEX,
+                "queries": [self._escape_lucene(query) for query in queries],
+                "limit": limit,
+            },
+        )
+        return self._group_hits(records=records)
+
+    def find_missing_entities(self, names: List[str]) -> Optional[List[str]]:
+        """找出图中没有同名节点的实体名称。
+
+        参数:
+            names (List[str]): 实体名称列表，例如Cypher语句中的字符串字面量
+
+        返回:
+            Optional[List[str]]: 没有名称完全相同节点的实体名称，实体名称全文索引不可用时返回None
+        """
+        if len(names) == 0:
+            return []
+        try:
+            hits = self._fulltext_hits(queries=names, limit=FUSION_CANDIDATE_FACTOR)
+        except ClientError as e:
+            log_error(e.message)
+            return None
+        return [
+            name
+            for i, name in enumerate(names)
+            if not any(
+                self._is_exact_match(node=hit.node, query=name)
+                for hit in hits.get(i, [])
+            )
+        ]
+
+    def _query_vector_nodes(
+        self, embeddings: List[List[float]], index_names: List[List[str]], top_k: int
+    ) -> Dict[int, List[NodeHit]]:
+        """在每个嵌入对应的向量索引中批量检索，所有查询只需一次数据库往返。
+
+        不存在的索引会先被过滤掉；批量查询出错（例如索引维度不匹配）时逐个索引重试，
+        只跳过出错的索引。
+        """
+        vector_index_names = set(self._get_vector_index_names())
+        index_names = [
+            [index_name for index_name in names if index_name in vector_index_names]
+            for names in index_names
+        ]
+        try:
+            records, _, _ = self._run_query(
+                query=dedent("""\
+                    UNWIND range(0, size($embeddings) - 1) AS i
+                    UNWIND $index_names[i] AS index_name
+                    CALL db.index.vector.queryNodes(index_name, $top_k, $embeddings[i])
+                    YIELD node, score
+                    RETURN i, elementId(node) AS element_id, labels(node) AS labels,
+                           node {.*, embedding: null} AS node, score\
+                    """),
+                parameters={
+                    "index_names": index_names,
+                    "embeddings": embeddings,
+                    "top_k": top_k,
+                },
+            )
+        except ClientError as e:
+            log_error(f"Batched vector search failed, retry per index: {e.message}")
+            records = []
+            for i, (embedding, names) in enumerate(zip(embeddings, index_names)):
+                for index_name in names:
+                    try:
+                        index_records, _, _ = self._run_query(
+                            query=dedent("""\
+                                CALL db.index.vector.queryNodes($index_name, $top_k, $embedding)
+                                YIELD node, score
+                                RETURN $i AS i, elementId(node) AS element_id,
+                                       labels(node) AS labels,
+                                       node {.*, embedding: null} AS node, score\
+                                """),
+                            parameters={
+                                "i": i,
+                                "index_name": index_name,
+                                "embedding": embedding,
+                                "top_k": top_k,
+                            },
+                        )
+                    except ClientError as e:
+                        log_error(f"Skip vector index {index_name}: {e.message}")
+                        continue
+                    records.extend(index_records)
+        return self._group_hits(records=records)
+
+    def _group_hits(self, records: List[Record]) -> Dict[int, List[NodeHit]]:
+        grouped_hits: Dict[int, List[NodeHit]] = {}
+        for record in records:
+            grouped_hits.setdefault(record["i"], []).append(
+                NodeHit(
+                    element_id=record["element_id"],
+                    node=record["node"],
+                    score=record["score"],
+                    labels=record["labels"],
+                )
+            )
+        for hits in grouped_hits.values():
+            hits.sort(key=lambda hit: hit.score, reverse=True)
+        return grouped_hits
+
+    def _fuse_hits(
+        self, ranked_lists: List[List[NodeHit]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """使用倒数排名融合(RRF)合并多路检索结果。"""
+        fused_scores: Dict[str, float] = {}
+        nodes: Dict[str, Dict[str, Any]] = {}
+        for hits in ranked_lists:
+            seen = set()
+            for rank, hit in enumerate(hits):
+                if hit.element_id in seen:
+                    continue
+                seen.add(hit.element_id)
+                nodes[hit.element_id] = hit.node
+                fused_scores[hit.element_id] = fused_scores.get(
+                    hit.element_id, 0.0
+                ) + 1.0 / (RRF_K + rank + 1)
+        sorted_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)[:top_k]
+        return [
+            {**nodes[element_id], "score": round(fused_scores[element_id], 6)}
+            for element_id in sorted_ids
+        ]
+
+    def _is_exact_match(self, node: Dict[str, Any], query: str) -> bool:
+        query = query.strip()
+        return any(
+            self._is_name_key(key) and isinstance(value, str) and value.strip() == query
+            for key, value in node.items()
+        )
+
+    @staticmethod
+    def _is_name_key(key: str) -> bool:
+        return "name" in key.lower() or key.endswith("名称")
+
+    @staticmethod
+    def _escape_lucene(text: str) -> str:
+        # && 和 || 的每个字符单独转义
+        return re.sub(r'([+\-!(){}\[\]^"~*?:\\/&|])', r"\\\1", text)
 
     def execute_cypher(self, cypher: str) -> str:
         """执行Cypher语句并返回结果。
@@ -181,12 +648,27 @@ class Neo4jTools(Toolkit):
                 - 如果结果是普通记录，返回JSON格式字符串
                 - 如果存在语法错误，返回错误信息
         """
+        charge_db_query()
+        query, parameters = cypher, {}
+        if self.parameterize:
+            query, parameters = parameterize_cypher(cypher=cypher)
         try:
             formatted_records, digraph, formatted_summary = self._execute_cypher(
-                cypher=cypher
+                cypher=query, parameters=parameters
             )
-        except CypherSyntaxError as e:
-            return e.message
+        except ClientError as e:
+            if len(parameters) == 0:
+                if isinstance(e, CypherSyntaxError):
+                    return e.message
+                raise
+            # fall back to the literal query if the extracted parameters are rejected
+            log_debug(f"Parameterized query failed, retry without parameters: {e}")
+            try:
+                formatted_records, digraph, formatted_summary = self._execute_cypher(
+                    cypher=cypher
+                )
+            except CypherSyntaxError as e:
+                return e.message
 
         result_str = (
             json.dumps(obj=formatted_records, ensure_ascii=False, indent=2)
@@ -202,6 +684,125 @@ class Neo4jTools(Toolkit):
             return_str += f"Result:\n{result_str}"
         return return_str
 
+    def validate_cypher(self, cypher: str) -> str:
+        """在只读事务中使用EXPLAIN校验Cypher语句，不会真正执行。执行Cypher语句之前先使用该函数校验。
+
+        参数:
+            cypher (str): 要校验的Cypher查询语句
+
+        返回:
+            str: JSON格式字符串，包含是否有效、语法错误、警告、预估行数和执行计划使用的算子
+        """
+        charge_db_query()
+        validation = self.explain_cypher(cypher=cypher)
+        return json.dumps(obj=validation, ensure_ascii=False, indent=2)
+
+    def explain_cypher(self, cypher: str) -> Dict[str, Any]:
+        """使用EXPLAIN获取Cypher语句的执行计划而不执行它。
+
+        启用离线校验时先在本地解析语句，本地即可发现的语法错误不会再访问数据库。
+
+        参数:
+            cypher (str): 要校验的Cypher查询语句
+
+        返回:
+            Dict[str, Any]: 包含以下键的字典
+                - valid: 语句能否通过编译
+                - errors: 语法或语义错误信息列表
+                - warnings: 来自summary_notifications的警告列表
+                - estimated_rows: 执行计划预估返回的行数
+                - operators: 执行计划使用的算子列表
+        """
+        if self.offline_validation:
+            local_error = check_cypher(cypher=cypher)
+            if local_error is not None:
+                return {
+                    "valid": False,
+                    "errors": [local_error],
+                    "warnings": [],
+                    "estimated_rows": None,
+                    "operators": [],
+                }
+
+        query, parameters = cypher, {}
+        if self.parameterize:
+            query, parameters = parameterize_cypher(cypher=cypher)
+
+        def _explain(tx):
+            return tx.run(f"EXPLAIN {query}", parameters).consume()
+
+        self._record_query(query=query, parameterized=len(parameters) > 0)
+        try:
+            with self._driver.session(database=self.database) as session:
+                summary: ResultSummary = session.execute_read(_explain)
+        except ClientError as e:
+            return {
+                "valid": False,
+                "errors": [e.message],
+                "warnings": [],
+                "estimated_rows": None,
+                "operators": [],
+            }
+
+        plan = summary.plan or {}
+        operators = []
+        plans = [plan]
+        while plans:
+            current = plans.pop(0)
+            operator = current.get("operatorType")
+            if operator is not None:
+                operator = operator.split("@")[0]
+                if operator not in operators:
+                    operators.append(operator)
+            plans.extend(current.get("children", []))
+        return {
+            "valid": True,
+            "errors": [],
+            "warnings": [
+                f"{notification.title}: {notification.description}"
+                for notification in summary.summary_notifications
+            ],
+            "estimated_rows": plan.get("args", {}).get("EstimatedRows"),
+            "operators": operators,
+        }
+
+    def fetch_records(self, cypher: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """在只读事务中执行Cypher语句，只取回前limit条记录，用于快速检查结果。
+
+        参数:
+            cypher (str): 要执行的Cypher查询语句
+            limit (int, 可选): 最多取回的记录数，默认为10
+
+        返回:
+            List[Dict[str, Any]]: 格式化后的记录列表
+
+        异常:
+            ClientError: 语句无法执行或尝试写入数据时抛出
+        """
+        query, parameters = cypher, {}
+        if self.parameterize:
+            query, parameters = parameterize_cypher(cypher=cypher)
+
+        def _fetch(tx):
+            result = tx.run(query, parameters)
+            keys = result.keys()
+            records = result.fetch(limit)
+            result.consume()
+            return keys, records
+
+        self._record_query(query=query, parameterized=len(parameters) > 0)
+        with self._driver.session(database=self.database) as session:
+            keys, records = session.execute_read(_fetch)
+        formatted_records, _ = self._format_records(keys=keys, records=records)
+        return formatted_records
+
+    def _get_vector_index_names(self) -> List[str]:
+        def _show_vector_indexes() -> List[str]:
+            indexs = self._get_indexs(keys_to_keep=["name", "type"])
+            return [index["name"] for index in indexs if index["type"] == "VECTOR"]
+
+        return self._get_shared(name="vector_index_names", compute=_show_vector_indexes)
+
     def _get_indexs(self, keys_to_keep: List[str] = ["name"]) -> List[str]:
         result, _, _ = self._execute_cypher(cypher="SHOW INDEXES")
         indexes = self._extract_keys(
@@ -224,17 +825,45 @@ class Neo4jTools(Toolkit):
                 - 字典组成的列表，表示格式化后的查询结果
                 - 表示查询结果关系的Digraph对象
         """
-        parameters = parameters or {}
+        records, summary, keys = self._run_query(query=cypher, parameters=parameters)
+
+        formatted_records, digraph = self._format_records(keys=keys, records=records)
+        formatted_summary = self._format_summary(summary=summary)
+        return formatted_records, digraph, formatted_summary
+
+    def _run_query(
+        self, query: str, parameters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Record], ResultSummary, List[str]]:
+        """通过驱动执行查询，并记录查询次数和估计的执行计划缓存命中情况。
 
+        Neo4j按查询文本缓存执行计划，这里在客户端用同等容量的LRU模拟该缓存来估计命中率。
+        """
+        parameters = parameters or {}
+        self._record_query(query=query, parameterized=len(parameters) > 0)
         records, summary, keys = self._driver.execute_query(
-            query_=cypher,
+            query_=query,
             parameters_=parameters,
             database_=self.database,
         )
+        return records, summary, keys
 
-        formatted_records, digraph = self._format_records(keys=keys, records=records)
-        formatted_summary = self._format_summary(summary=summary)
-        return formatted_records, digraph, formatted_summary
+    def _record_query(self, query: str, parameterized: bool = False):
+        with self._metrics_lock:
+            self.metrics.queries += 1
+            if parameterized:
+                self.metrics.parameterized_queries += 1
+            if query in self._planned_queries:
+                self.metrics.estimated_plan_cache_hits += 1
+                self._planned_queries.move_to_end(query)
+            else:
+                self._planned_queries[query] = None
+                if len(self._planned_queries) > self.plan_cache_size:
+                    self._planned_queries.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """返回查询次数、参数化查询次数和估计的执行计划缓存命中率等工具指标。"""
+        with self._metrics_lock:
+            return self.metrics.to_dict()
 
     def _format_summary(self, summary: ResultSummary):
         formatted_summary = ""
@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Iterator, Union
+from typing import Callable, Optional
+from uuid import uuid4
 
 import gradio as gr
-from agno.run.team import TeamRunResponse
 from agno.workflow import RunResponse
 from gradio import ChatMessage
 
@@ -14,8 +14,12 @@ FAVICON = "./assets/robot.png"
 
 
 class ChatUI:
-    def __init__(self, workflow: NL2CypherWorkflow) -> None:
-        self.workflow = workflow
+    def __init__(
+        self, workflow_factory: Callable[[Optional[str]], NL2CypherWorkflow]
+    ) -> None:
+        # Chats run concurrently, so every message gets its own workflow for the
+        # session of its browser tab
+        self.workflow_factory = workflow_factory
         self.currentDateAndTime = datetime.now()
         self.app = self._build_chatui(get_response=self.get_stream_response)
 
@@ -32,6 +36,7 @@ class ChatUI:
         self,
         message: str,
         history: str,
+        session_id: str,
     ):
         think_message = ChatMessage(
             content="",
@@ -43,27 +48,25 @@ class ChatUI:
         )
 
         try:
-            run_response: Iterator[Union[RunResponse, TeamRunResponse]] = (
-                self.workflow.run(question=message)
-            )
+            workflow = self.workflow_factory(session_id)
+            run_response: RunResponse = await workflow.arun(question=message)
         except KeyboardInterrupt as e:
             raise e
         except Exception as e:
             chat_message.content += "\n出错了!:\n"
-            chat_message.content += e
+            chat_message.content += str(e)
             yield chat_message
             return
 
-        for resp in run_response:
-            run_response_content, other_message = get_run_response(run_response=resp)
-
-            if run_response_content != "Run started":
-                chat_message.content += run_response_content
-            think_message.content += other_message
-            if len(think_message.content) > 0:
-                yield [think_message, chat_message]
-            else:
-                yield chat_message
+        run_response_content, other_message = get_run_response(
+            run_response=run_response
+        )
+        chat_message.content += run_response_content
+        think_message.content += other_message
+        if len(think_message.content) > 0:
+            yield [think_message, chat_message]
+        else:
+            yield chat_message
 
     def _build_chatui(self, get_response):
         with gr.Blocks(
@@ -80,6 +83,7 @@ class ChatUI:
                 fn=get_response,
                 type="messages",
                 chatbot=chatbot,
+                additional_inputs=[gr.State(value=lambda: str(uuid4()))],
                 textbox=gr.Textbox(
                     placeholder="Type your question here...",
                     container=False,
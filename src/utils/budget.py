@@ -0,0 +1,133 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from agno.exceptions import StopAgentRun
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class Budget:
+    """单个问题的成本和延迟预算，任意一项为None表示不限制。
+
+    time_limit 为从开始计时起允许的秒数，其余三项分别限制LLM调用次数、token总数和数据库查询次数。
+    数据库查询次数只计模型调用的数据库工具，工具内部和工作流自身的查询（模式哈希、索引、校验评分）不计入。
+    """
+
+    time_limit: Optional[float] = None
+    max_llm_calls: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_db_queries: Optional[int] = None
+    llm_calls: int = 0
+    tokens: int = 0
+    db_queries: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def start(self):
+        self.started_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def remaining_seconds(self) -> Optional[float]:
+        if self.time_limit is None:
+            return None
+        return max(self.time_limit - self.elapsed, 0.0)
+
+    @property
+    def exhausted_reason(self) -> Optional[str]:
+        if self.time_limit is not None and self.elapsed >= self.time_limit:
+            return f"超出时间预算 {self.time_limit}s"
+        if self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls:
+            return f"超出LLM调用次数预算 {self.max_llm_calls}"
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return f"超出token预算 {self.max_tokens}"
+        if self.max_db_queries is not None and self.db_queries >= self.max_db_queries:
+            return f"超出数据库查询次数预算 {self.max_db_queries}"
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.exhausted_reason is not None
+
+    def check(self):
+        """预算耗尽时抛出BudgetExceeded。"""
+        reason = self.exhausted_reason
+        if reason is not None:
+            raise BudgetExceeded(reason)
+
+    def charge_llm(self, calls: int = 1, tokens: int = 0):
+        self.llm_calls += calls
+        self.tokens += tokens
+
+    def charge_db_query(self, queries: int = 1):
+        self.db_queries += queries
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": round(self.elapsed, 3),
+            "llm_calls": self.llm_calls,
+            "tokens": self.tokens,
+            "db_queries": self.db_queries,
+            "exhausted_reason": self.exhausted_reason,
+        }
+
+
+# 当前问题的预算，随asyncio任务和asyncio.to_thread的上下文一起传递到团队和工具中
+_current_budget: ContextVar[Optional[Budget]] = ContextVar(
+    "current_budget", default=None
+)
+
+
+def get_budget() -> Optional[Budget]:
+    return _current_budget.get()
+
+
+@contextmanager
+def use_budget(budget: Optional[Budget]) -> Iterator[Optional[Budget]]:
+    """在当前上下文中启用预算，退出时恢复之前的预算。"""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def charge_db_query(queries: int = 1):
+    budget = get_budget()
+    if budget is not None:
+        budget.charge_db_query(queries=queries)
+
+
+def charge_run_response(run_response: Any):
+    """按一次智能体/团队运行的指标扣减LLM调用次数和token，包括成员的运行。"""
+    budget = get_budget()
+    if budget is None or run_response is None:
+        return
+    metrics = getattr(run_response, "metrics", None) or {}
+    total_tokens = metrics.get("total_tokens", [])
+    if not isinstance(total_tokens, list):
+        total_tokens = [total_tokens]
+    budget.charge_llm(calls=max(len(total_tokens), 1), tokens=sum(total_tokens))
+    for member_response in getattr(run_response, "member_responses", None) or []:
+        charge_run_response(run_response=member_response)
+
+
+def budget_tool_hook(
+    function_name: str, function_call: Callable, arguments: Dict[str, Any]
+):
+    """工具调用钩子：预算耗尽时停止智能体运行，不再继续调用工具。"""
+    budget = get_budget()
+    if budget is not None and budget.exhausted:
+        raise StopAgentRun(
+            f"{budget.exhausted_reason}，停止调用工具 {function_name}",
+            agent_message=f"{budget.exhausted_reason}，请直接根据已有信息给出回答。",
+        )
+    return function_call(**arguments)
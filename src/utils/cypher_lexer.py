@@ -0,0 +1,244 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+WHITESPACE = "WHITESPACE"
+COMMENT = "COMMENT"
+STRING = "STRING"
+NUMBER = "NUMBER"
+IDENTIFIER = "IDENTIFIER"
+ESCAPED_IDENTIFIER = "ESCAPED_IDENTIFIER"
+PARAMETER = "PARAMETER"
+OPERATOR = "OPERATOR"
+PUNCTUATION = "PUNCTUATION"
+
+_TOKEN_PATTERNS = [
+    (WHITESPACE, r"\s+"),
+    (COMMENT, r"//[^\n]*|/\*.*?\*/"),
+    (STRING, r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""),
+    (ESCAPED_IDENTIFIER, r"`(?:[^`]|``)*`"),
+    (
+        NUMBER,
+        r"0x[0-9a-fA-F]+|(?:\d+\.\d+|\.\d+|\d+)(?:[eE][+-]?\d+)?",
+    ),
+    (PARAMETER, r"\$(?:\w+|`(?:[^`]|``)*`)"),
+    (IDENTIFIER, r"[^\W\d]\w*"),
+    (OPERATOR, r"<>|<=|>=|=~|\+=|\.\.|->|<-|::|\|\||[-+*/%^=<>|!&]"),
+    (PUNCTUATION, r"[()\[\]{},.:;$]"),
+]
+_TOKEN_REGEX = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _TOKEN_PATTERNS),
+    flags=re.DOTALL,
+)
+
+_SCHEMA_KEYWORDS = {"INDEX", "INDEXES", "CONSTRAINT", "CONSTRAINTS", "SHOW", "DROP"}
+# Keywords a Cypher statement can start with, used to recognise unlabelled code blocks
+_CLAUSE_KEYWORDS = {
+    "MATCH",
+    "OPTIONAL",
+    "WITH",
+    "UNWIND",
+    "CALL",
+    "RETURN",
+    "CREATE",
+    "MERGE",
+    "EXPLAIN",
+    "PROFILE",
+}
+_CODE_BLOCK_PATTERN = re.compile(r"```([^\n`]*)\n(.*?)```", flags=re.DOTALL)
+
+
+class CypherLexError(ValueError):
+    def __init__(self, message: str, position: int) -> None:
+        super().__init__(message)
+        self.message = message
+        self.position = position
+
+
+@dataclass(frozen=True)
+class Token:
+    type: str
+    text: str
+    position: int
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper()
+
+    @property
+    def is_significant(self) -> bool:
+        return self.type not in (WHITESPACE, COMMENT)
+
+
+def tokenize(cypher: str, keep_trivia: bool = True) -> List[Token]:
+    """将Cypher语句切分为词法单元。
+
+    参数:
+        cypher (str): 待切分的Cypher语句
+        keep_trivia (bool, 可选): 是否保留空白和注释，默认为True
+
+    返回:
+        List[Token]: 词法单元列表，保留空白和注释时可以无损拼接回原语句
+
+    异常:
+        CypherLexError: 出现无法识别的字符（例如未闭合的字符串）时抛出
+    """
+    tokens = []
+    position = 0
+    while position < len(cypher):
+        match = _TOKEN_REGEX.match(cypher, position)
+        if match is None:
+            char = cypher[position]
+            if char in "'\"`":
+                raise CypherLexError(f"未闭合的引号 {char}", position)
+            raise CypherLexError(f"无法识别的字符 {char!r}", position)
+        token = Token(type=match.lastgroup, text=match.group(), position=position)
+        if keep_trivia or token.is_significant:
+            tokens.append(token)
+        position = match.end()
+    return tokens
+
+
+def parameterize_cypher(cypher: str, prefix: str = "lit") -> Tuple[str, Dict[str, Any]]:
+    """将Cypher语句中的字符串和数字字面量提取为参数，使结构相同的语句复用同一个执行计划。
+
+    变长关系的跳数（如 ``[*1..5]``）以及索引/约束等模式命令中的字面量不允许参数化，保持原样。
+
+    参数:
+        cypher (str): 待参数化的Cypher语句
+        prefix (str, 可选): 生成参数名的前缀，默认为"lit"
+
+    返回:
+        Tuple[str, Dict[str, Any]]:
+            - 参数化后的Cypher语句
+            - 参数名到字面量值的映射；无法参数化时返回原语句和空字典
+    """
+    try:
+        tokens = tokenize(cypher)
+    except CypherLexError:
+        return cypher, {}
+    significant = [token for token in tokens if token.is_significant]
+    if any(token.upper in _SCHEMA_KEYWORDS for token in significant):
+        return cypher, {}
+
+    used_names = {token.text[1:] for token in significant if token.type == PARAMETER}
+    parameters: Dict[str, Any] = {}
+    names_by_value: Dict[Tuple[type, Any], str] = {}
+    replacements: Dict[int, str] = {}
+    bracket_stack: List[bool] = []
+    for index, token in enumerate(significant):
+        previous = significant[index - 1] if index > 0 else None
+        following = significant[index + 1] if index + 1 < len(significant) else None
+        if token.text == "[":
+            # `-[` / `<-[` opens a relationship pattern
+            bracket_stack.append(previous is not None and previous.text in ("-", "<-"))
+            continue
+        if token.text == "]":
+            if bracket_stack:
+                bracket_stack.pop()
+            continue
+        if token.type not in (STRING, NUMBER):
+            continue
+        in_relationship = bool(bracket_stack) and bracket_stack[-1]
+        if (
+            token.type == NUMBER
+            and in_relationship
+            and (
+                (previous is not None and previous.text in ("*", ".."))
+                or (following is not None and following.text == "..")
+            )
+        ):
+            continue
+
+        value = _literal_value(token)
+        key = (type(value), value)
+        if key not in names_by_value:
+            name = f"{prefix}{len(names_by_value)}"
+            while name in used_names:
+                name = f"_{name}"
+            names_by_value[key] = name
+            parameters[name] = value
+        replacements[token.position] = f"${names_by_value[key]}"
+
+    if len(replacements) == 0:
+        return cypher, {}
+    query = "".join(replacements.get(token.position, token.text) for token in tokens)
+    return query, parameters
+
+
+def string_literals(cypher: str) -> List[str]:
+    """提取Cypher语句中的字符串字面量（按出现顺序去重），无法切分时返回空列表。"""
+    try:
+        tokens = tokenize(cypher, keep_trivia=False)
+    except CypherLexError:
+        return []
+    literals = []
+    for token in tokens:
+        if token.type == STRING:
+            value = _literal_value(token)
+            if value not in literals:
+                literals.append(value)
+    return literals
+
+
+def extract_cypher(text: str) -> Optional[str]:
+    """提取文本中最后一个Cypher代码块，不存在时返回None。
+
+    标注为cypher的代码块总是被接受；未标注语言的代码块只有能切分且以Cypher子句开头时才被接受，
+    这样紧跟在Cypher之后的JSON查询结果等代码块不会被当作Cypher。
+    """
+    blocks = []
+    for language, block in _CODE_BLOCK_PATTERN.findall(text):
+        language, block = language.strip().lower(), block.strip()
+        if len(block) == 0:
+            continue
+        if language == "cypher" or (language == "" and _starts_with_clause(block)):
+            blocks.append(block)
+    if len(blocks) == 0:
+        return None
+    return blocks[-1]
+
+
+def _starts_with_clause(cypher: str) -> bool:
+    try:
+        tokens = tokenize(cypher, keep_trivia=False)
+    except CypherLexError:
+        return False
+    return (
+        len(tokens) > 0
+        and tokens[0].type == IDENTIFIER
+        and tokens[0].upper in _CLAUSE_KEYWORDS
+    )
+
+
+def _literal_value(token: Token) -> Any:
+    if token.type == STRING:
+        return _unescape_string(token.text[1:-1])
+    text = token.text.lower()
+    if text.startswith("0x"):
+        return int(text, 16)
+    if any(char in text for char in ".e"):
+        return float(text)
+    return int(text)
+
+
+_ESCAPES = {
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "b": "\b",
+    "f": "\f",
+}
+
+
+def _unescape_string(text: str) -> str:
+    def _replace(match: re.Match) -> str:
+        escaped = match.group(1)
+        if escaped.startswith("u"):
+            return chr(int(escaped[1:], 16))
+        return _ESCAPES.get(escaped, match.group())
+
+    return re.sub(r"\\(u[0-9a-fA-F]{4}|.)", _replace, text)
@@ -0,0 +1,982 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from utils.cypher_lexer import (
+    ESCAPED_IDENTIFIER,
+    IDENTIFIER,
+    NUMBER,
+    PARAMETER,
+    STRING,
+    CypherLexError,
+    Token,
+    tokenize,
+)
+
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+
+_CLAUSE_KEYWORDS = {
+    "USE",
+    "MATCH",
+    "OPTIONAL",
+    "CREATE",
+    "MERGE",
+    "UNWIND",
+    "WITH",
+    "RETURN",
+    "CALL",
+    "SET",
+    "REMOVE",
+    "DELETE",
+    "DETACH",
+    "NODETACH",
+    "FOREACH",
+    "LOAD",
+    "FINISH",
+    "UNION",
+    "ORDER",
+    "SKIP",
+    "OFFSET",
+    "LIMIT",
+}
+
+# 以这些关键字开头的语句是管理/模式命令，只做括号检查，不做完整解析
+_ADMIN_KEYWORDS = {
+    "SHOW",
+    "DROP",
+    "ALTER",
+    "GRANT",
+    "DENY",
+    "REVOKE",
+    "START",
+    "STOP",
+    "TERMINATE",
+    "RENAME",
+    "ENABLE",
+    "DRYRUN",
+    "REALLOCATE",
+    "DEALLOCATE",
+    "EXPLAIN",
+    "PROFILE",
+}
+
+_UPDATING_CLAUSES = {"CREATE", "MERGE", "SET", "REMOVE", "DELETE", "FOREACH"}
+_FINAL_CLAUSES = _UPDATING_CLAUSES | {"RETURN", "FINISH", "CALL"}
+
+_CONSTANTS = {"TRUE", "FALSE", "NULL", "NAN", "INF", "INFINITY"}
+_LIST_PREDICATES = {"ALL", "ANY", "NONE", "SINGLE"}
+_PATH_FUNCTIONS = {"SHORTESTPATH", "ALLSHORTESTPATHS"}
+_PATH_SELECTOR_KEYWORDS = {"ANY", "ALL", "SHORTEST", "GROUP", "GROUPS", "PATH", "PATHS"}
+_MATCH_MODE_KEYWORDS = {"REPEATABLE", "DIFFERENT", "ELEMENTS", "RELATIONSHIPS"}
+_COMPARISON_OPERATORS = {"=", "<>", "<", ">", "<=", ">=", "=~"}
+
+
+class CypherParseError(ValueError):
+    def __init__(self, message: str, position: int, cypher: str = "") -> None:
+        line = cypher.count("\n", 0, position) + 1
+        column = position - (cypher.rfind("\n", 0, position) + 1) + 1
+        super().__init__(f"{message} (line {line}, column {column})")
+        self.message = message
+        self.position = position
+        self.line = line
+        self.column = column
+
+
+@dataclass
+class ParsedCypher:
+    clauses: List[str] = field(default_factory=list)
+    variables: Set[str] = field(default_factory=set)
+    is_admin_command: bool = False
+
+
+def parse_cypher(cypher: str) -> ParsedCypher:
+    """在本地解析Cypher语句，无需访问数据库即可发现明显的语法错误。
+
+    覆盖Cypher速查表中的查询子句（MATCH/WITH/RETURN/CALL/UNWIND/更新子句等）和表达式，
+    可以发现括号不匹配、未知子句和未定义变量等错误；管理和模式命令只做括号检查。
+
+    参数:
+        cypher (str): 待解析的Cypher语句
+
+    返回:
+        ParsedCypher: 解析出的子句列表和顶层定义的变量
+
+    异常:
+        CypherParseError: 语句存在语法错误时抛出
+    """
+    try:
+        tokens = tokenize(cypher, keep_trivia=False)
+    except CypherLexError as e:
+        raise CypherParseError(e.message, e.position, cypher) from e
+    return _CypherParser(cypher=cypher, tokens=tokens).parse()
+
+
+def check_cypher(cypher: str) -> Optional[str]:
+    """本地检查Cypher语句，返回错误信息；语句没有发现错误时返回None。"""
+    try:
+        parse_cypher(cypher)
+    except CypherParseError as e:
+        return str(e)
+    return None
+
+
+class _CypherParser:
+    def __init__(self, cypher: str, tokens: List[Token]) -> None:
+        self.cypher = cypher
+        self.tokens = tokens
+        self.index = 0
+        self.result = ParsedCypher()
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def at(self, *texts: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.text in texts
+
+    def at_keyword(self, *words: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.type == IDENTIFIER and token.upper in words
+
+    def advance(self) -> Token:
+        token = self.peek()
+        if token is None:
+            raise self.error("语句意外结束")
+        self.index += 1
+        return token
+
+    def accept(self, *texts: str) -> bool:
+        if self.at(*texts):
+            self.index += 1
+            return True
+        return False
+
+    def accept_keyword(self, *words: str) -> bool:
+        if self.at_keyword(*words):
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, text: str) -> Token:
+        if not self.at(text):
+            raise self.error(f"此处应为 '{text}'")
+        return self.advance()
+
+    def expect_keyword(self, *words: str) -> Token:
+        if not self.at_keyword(*words):
+            raise self.error(f"此处应为 {'/'.join(words)}")
+        return self.advance()
+
+    def error(self, message: str) -> CypherParseError:
+        token = self.peek()
+        if token is None:
+            return CypherParseError(message, len(self.cypher), self.cypher)
+        return CypherParseError(
+            f"{message}，实际为 '{token.text}'", token.position, self.cypher
+        )
+
+    def at_name(self, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.type in (IDENTIFIER, ESCAPED_IDENTIFIER)
+
+    def parse_name(self) -> str:
+        if not self.at_name():
+            raise self.error("此处应为名称")
+        token = self.advance()
+        if token.type == ESCAPED_IDENTIFIER:
+            return token.text[1:-1].replace("``", "`")
+        return token.text
+
+    def at_clause(self) -> bool:
+        return self.at_keyword(*_CLAUSE_KEYWORDS)
+
+    def parse(self) -> ParsedCypher:
+        self.check_brackets()
+        while self.accept(";"):
+            pass
+        if self.peek() is None:
+            raise CypherParseError("语句为空", 0, self.cypher)
+        if self.is_admin_command():
+            self.result.is_admin_command = True
+            self.result.clauses.append(self.peek().upper)
+            return self.result
+
+        scope: Set[str] = set()
+        self.parse_query(scope=scope, top_level=True)
+        while self.accept(";"):
+            pass
+        if self.peek() is not None:
+            if self.at_name():
+                raise self.error("未知子句")
+            raise self.error("无法解析的内容")
+        return self.result
+
+    def check_brackets(self):
+        stack: List[Token] = []
+        for token in self.tokens:
+            if token.text in _BRACKETS:
+                stack.append(token)
+            elif token.text in _BRACKETS.values():
+                if not stack or _BRACKETS[stack[-1].text] != token.text:
+                    raise CypherParseError(
+                        f"括号不匹配：'{token.text}' 没有对应的左括号",
+                        token.position,
+                        self.cypher,
+                    )
+                stack.pop()
+        if stack:
+            raise CypherParseError(
+                f"括号不匹配：'{stack[-1].text}' 没有闭合",
+                stack[-1].position,
+                self.cypher,
+            )
+
+    def is_admin_command(self) -> bool:
+        if self.at_keyword(*_ADMIN_KEYWORDS):
+            return True
+        # CREATE INDEX / CREATE CONSTRAINT / CREATE USER ... 不是模式创建
+        return (
+            self.at_keyword("CREATE")
+            and not self.at("(", offset=1)
+            and not self.at("=", offset=2)
+        )
+
+    def parse_query(self, scope: Set[str], top_level: bool = False) -> Set[str]:
+        """解析由UNION连接的查询，返回查询最终投影出的变量。"""
+        returned = self.parse_single_query(scope=set(scope), top_level=top_level)
+        while self.accept_keyword("UNION"):
+            self.accept_keyword("ALL", "DISTINCT")
+            self.parse_single_query(scope=set(scope), top_level=top_level)
+        return returned
+
+    def parse_single_query(self, scope: Set[str], top_level: bool) -> Set[str]:
+        last_clause = None
+        while self.peek() is not None and not self.at("}", ";"):
+            if self.at_keyword("UNION"):
+                break
+            if last_clause == "RETURN":
+                raise self.error("RETURN 只能作为查询的最后一个子句")
+            if not self.at_clause():
+                if self.at_name():
+                    raise self.error("未知子句")
+                raise self.error("此处应为子句关键字")
+            last_clause, scope = self.parse_clause(scope=scope)
+            self.result.clauses.append(last_clause)
+            if top_level:
+                self.result.variables |= scope
+        if last_clause is None:
+            raise self.error("此处应为子句")
+        if top_level and last_clause not in _FINAL_CLAUSES:
+            raise CypherParseError(
+                f"查询不能以 {last_clause} 结尾，需要 RETURN 或更新子句",
+                self.peek().position if self.peek() else len(self.cypher),
+                self.cypher,
+            )
+        return scope
+
+    def parse_clause(self, scope: Set[str]):
+        keyword = self.advance().upper
+        if keyword == "USE":
+            self.parse_graph_reference()
+        elif keyword == "OPTIONAL":
+            if self.accept_keyword("CALL"):
+                scope = self.parse_call(scope=scope)
+                return "CALL", scope
+            self.expect_keyword("MATCH")
+            self.parse_match(scope=scope)
+            keyword = "MATCH"
+        elif keyword == "MATCH":
+            self.parse_match(scope=scope)
+        elif keyword == "CREATE":
+            self.parse_pattern_list(scope=scope, defines=scope)
+        elif keyword == "MERGE":
+            self.parse_pattern_part(scope=scope, defines=scope)
+            while self.at_keyword("ON"):
+                self.advance()
+                self.expect_keyword("CREATE", "MATCH")
+                self.expect_keyword("SET")
+                self.parse_set_items(scope=scope)
+        elif keyword == "UNWIND":
+            self.parse_expression(scope=scope)
+            self.expect_keyword("AS")
+            scope.add(self.parse_name())
+        elif keyword == "WITH":
+            scope = self.parse_projection(scope=scope, clause="WITH")
+        elif keyword == "RETURN":
+            scope = self.parse_projection(scope=scope, clause="RETURN")
+        elif keyword == "CALL":
+            scope = self.parse_call(scope=scope)
+        elif keyword == "SET":
+            self.parse_set_items(scope=scope)
+        elif keyword == "REMOVE":
+            self.parse_remove_items(scope=scope)
+        elif keyword in ("DETACH", "NODETACH"):
+            self.expect_keyword("DELETE")
+            self.parse_expression_list(scope=scope)
+            keyword = "DELETE"
+        elif keyword == "DELETE":
+            self.parse_expression_list(scope=scope)
+        elif keyword == "FOREACH":
+            self.parse_foreach(scope=scope)
+        elif keyword == "LOAD":
+            self.expect_keyword("CSV")
+            if self.accept_keyword("WITH"):
+                self.expect_keyword("HEADERS")
+            self.expect_keyword("FROM")
+            self.parse_expression(scope=scope)
+            self.expect_keyword("AS")
+            scope.add(self.parse_name())
+            if self.accept_keyword("FIELDTERMINATOR"):
+                self.parse_expression(scope=scope)
+        elif keyword == "FINISH":
+            pass
+        elif keyword in ("ORDER", "SKIP", "OFFSET", "LIMIT"):
+            # 独立的 ORDER BY / SKIP / LIMIT 子句
+            self.index -= 1
+            self.parse_projection_tail(scope=scope, projected=set(), clause=keyword)
+        else:
+            self.index -= 1
+            raise self.error("未知子句")
+        return keyword, scope
+
+    def parse_graph_reference(self):
+        self.parse_name()
+        while self.accept("."):
+            self.parse_name()
+        if self.at("("):
+            self.parse_arguments(scope=set(), lenient=True)
+
+    def parse_match(self, scope: Set[str]):
+        while self.at_keyword(*_MATCH_MODE_KEYWORDS):
+            self.advance()
+        self.parse_pattern_list(scope=scope, defines=scope)
+        while self.accept_keyword("USING"):
+            # USING INDEX n:Label(prop) / USING SCAN n:Label / USING JOIN ON n
+            while not self.at_clause() and not self.at_keyword("WHERE", "USING"):
+                if self.peek() is None or self.at("}", ";"):
+                    break
+                self.advance()
+        if self.accept_keyword("WHERE"):
+            self.parse_expression(scope=scope)
+
+    def parse_projection(self, scope: Set[str], clause: str) -> Set[str]:
+        self.accept_keyword("DISTINCT")
+        projected: Set[str] = set()
+        if self.accept("*"):
+            projected |= scope
+            if not self.accept(","):
+                return self.parse_projection_tail(scope, projected, clause)
+        while True:
+            start = self.index
+            self.parse_expression(scope=scope)
+            if self.accept_keyword("AS"):
+                projected.add(self.parse_name())
+            elif self.index - start == 1 and self.tokens[start].type in (
+                IDENTIFIER,
+                ESCAPED_IDENTIFIER,
+            ):
+                projected.add(self._name_of(self.tokens[start]))
+            elif clause == "WITH":
+                raise CypherParseError(
+                    "WITH 中的表达式必须使用 AS 指定别名",
+                    self.tokens[start].position,
+                    self.cypher,
+                )
+            if not self.accept(","):
+                break
+        return self.parse_projection_tail(scope, projected, clause)
+
+    def parse_projection_tail(
+        self, scope: Set[str], projected: Set[str], clause: str
+    ) -> Set[str]:
+        visible = scope | projected
+        if self.accept_keyword("ORDER"):
+            self.expect_keyword("BY")
+            while True:
+                self.parse_expression(scope=visible)
+                self.accept_keyword("ASC", "ASCENDING", "DESC", "DESCENDING")
+                if not self.accept(","):
+                    break
+        if self.accept_keyword("SKIP", "OFFSET"):
+            self.parse_expression(scope=visible)
+        if self.accept_keyword("LIMIT"):
+            self.parse_expression(scope=visible)
+        if clause == "WITH" and self.accept_keyword("WHERE"):
+            self.parse_expression(scope=visible)
+        return projected
+
+    def parse_call(self, scope: Set[str]) -> Set[str]:
+        if self.at("(") or self.at("{"):
+            inner_scope = set(scope)
+            if self.accept("("):
+                if not self.accept("*"):
+                    inner_scope = set()
+                    while not self.at(")"):
+                        name = self.parse_name()
+                        self.check_variable(name, scope, self.tokens[self.index - 1])
+                        inner_scope.add(name)
+                        if not self.accept(","):
+                            break
+                self.expect(")")
+            self.expect("{")
+            returned = self.parse_query(scope=inner_scope)
+            self.expect("}")
+            if self.accept_keyword("IN"):
+                self.parse_in_transactions(scope=scope)
+            return scope | returned
+
+        self.parse_name()
+        while self.accept("."):
+            self.parse_name()
+        if self.at("("):
+            self.parse_arguments(scope=scope)
+        if self.accept_keyword("YIELD"):
+            if self.accept("*"):
+                return scope
+            while True:
+                name = self.parse_name()
+                if self.accept_keyword("AS"):
+                    name = self.parse_name()
+                scope.add(name)
+                if not self.accept(","):
+                    break
+            if self.accept_keyword("WHERE"):
+                self.parse_expression(scope=scope)
+        return scope
+
+    def parse_in_transactions(self, scope: Set[str]):
+        # IN [n CONCURRENT] TRANSACTIONS [OF n ROWS] [ON ERROR ...] [REPORT STATUS AS s]
+        if not self.at_keyword("TRANSACTIONS", "CONCURRENT"):
+            self.parse_expression(scope=scope)
+        self.accept_keyword("CONCURRENT")
+        self.expect_keyword("TRANSACTIONS")
+        if self.accept_keyword("OF"):
+            self.parse_expression(scope=scope)
+            self.expect_keyword("ROW", "ROWS")
+        if self.accept_keyword("ON"):
+            self.expect_keyword("ERROR")
+            self.expect_keyword("CONTINUE", "BREAK", "FAIL", "RETRY")
+            while self.at_keyword("FOR", "THEN", "CONTINUE", "BREAK", "FAIL"):
+                self.advance()
+                if self.peek() is not None and self.peek().type == NUMBER:
+                    self.advance()
+                    self.accept_keyword("SECONDS", "SECOND")
+        if self.accept_keyword("REPORT"):
+            self.expect_keyword("STATUS")
+            self.expect_keyword("AS")
+            scope.add(self.parse_name())
+
+    def parse_set_items(self, scope: Set[str]):
+        while True:
+            self.parse_postfix_expression(scope=scope, allow_labels=False)
+            if self.accept("=", "+="):
+                self.parse_expression(scope=scope)
+            elif self.at(":") or self.at_keyword("IS"):
+                self.advance()
+                self.parse_label_expression(scope=scope)
+            else:
+                raise self.error("SET 子句此处应为 '='、'+=' 或标签")
+            if not self.accept(","):
+                break
+
+    def parse_remove_items(self, scope: Set[str]):
+        while True:
+            self.parse_postfix_expression(scope=scope, allow_labels=False)
+            if self.at(":") or self.at_keyword("IS"):
+                self.advance()
+                self.parse_label_expression(scope=scope)
+            if not self.accept(","):
+                break
+
+    def parse_foreach(self, scope: Set[str]):
+        self.expect("(")
+        name = self.parse_name()
+        self.expect_keyword("IN")
+        self.parse_expression(scope=scope)
+        self.expect("|")
+        inner_scope = scope | {name}
+        while not self.at(")"):
+            if not self.at_keyword(*_UPDATING_CLAUSES, "DETACH", "NODETACH"):
+                raise self.error("FOREACH 中只能使用更新子句")
+            _, inner_scope = self.parse_clause(scope=inner_scope)
+        self.expect(")")
+
+    def parse_pattern_list(self, scope: Set[str], defines: Set[str]):
+        while True:
+            self.parse_pattern_part(scope=scope, defines=defines)
+            if not self.accept(","):
+                break
+
+    def parse_pattern_part(self, scope: Set[str], defines: Set[str]):
+        if self.at_name() and self.at("=", offset=1):
+            defines.add(self.parse_name())
+            self.advance()
+        while self.at_keyword(*_PATH_SELECTOR_KEYWORDS) or (
+            self.peek() is not None and self.peek().type == NUMBER
+        ):
+            self.advance()
+        if self.at_name() and self.peek().upper in _PATH_FUNCTIONS:
+            self.advance()
+            self.expect("(")
+            self.parse_path(scope=scope, defines=defines)
+            self.expect(")")
+            return
+        self.parse_path(scope=scope, defines=defines)
+
+    def parse_path(self, scope: Set[str], defines: Set[str]) -> int:
+        """解析路径模式，返回其中关系模式的数量。"""
+        relationships = self.parse_path_primary(scope=scope, defines=defines)
+        while self.at("-", "<-", "<", "("):
+            if not self.at("("):
+                self.parse_relationship(scope=scope, defines=defines)
+                relationships += 1
+            # 带量词的括号路径可以与节点直接相邻: (a) ((x)-->(y)){1,3} (b)
+            relationships += self.parse_path_primary(scope=scope, defines=defines)
+        return relationships
+
+    def parse_path_primary(self, scope: Set[str], defines: Set[str]) -> int:
+        self.expect("(")
+        if self.at("(") or (self.at_name() and self.at("=", offset=1)):
+            # 带量词的括号路径 ((a)-->(b) WHERE ...){1,3}
+            self.parse_pattern_part(scope=scope, defines=defines)
+            if self.accept_keyword("WHERE"):
+                self.parse_expression(scope=scope | defines)
+            self.expect(")")
+            self.parse_quantifier()
+            return 1
+        self.parse_element_body(scope=scope, defines=defines)
+        self.expect(")")
+        return 0
+
+    def parse_element_body(
+        self, scope: Set[str], defines: Set[str], allow_range: bool = False
+    ):
+        if self.at_name() and not self.at_keyword("WHERE", "IS"):
+            defines.add(self.parse_name())
+        if self.at(":") or self.at_keyword("IS"):
+            self.advance()
+            self.parse_label_expression(scope=scope)
+        if allow_range and self.accept("*"):
+            if self.peek() is not None and self.peek().type == NUMBER:
+                self.advance()
+            if self.accept(".."):
+                if self.peek() is not None and self.peek().type == NUMBER:
+                    self.advance()
+        if self.at("{"):
+            self.parse_map_literal(scope=scope | defines)
+        elif self.peek() is not None and self.peek().type == PARAMETER:
+            self.advance()
+        if self.accept_keyword("WHERE"):
+            self.parse_expression(scope=scope | defines)
+
+    def parse_relationship(self, scope: Set[str], defines: Set[str]):
+        if self.accept("<"):
+            self.expect("-")
+        elif not self.accept("-", "<-"):
+            raise self.error("关系模式此处应为 '-' 或 '<-'")
+        if self.accept("["):
+            self.parse_element_body(scope=scope, defines=defines, allow_range=True)
+            self.expect("]")
+        if not self.accept("->", "-"):
+            raise self.error("关系模式此处应为 '-' 或 '->'")
+        self.parse_quantifier()
+
+    def parse_quantifier(self):
+        if self.accept("+", "*"):
+            return
+        if self.at("{") and (
+            self.at(",", offset=1)
+            or (self.peek(1) is not None and self.peek(1).type == NUMBER)
+        ):
+            self.advance()
+            while not self.at("}"):
+                if self.peek().type != NUMBER and not self.at(","):
+                    raise self.error("量词中只能包含数字")
+                self.advance()
+            self.expect("}")
+
+    def parse_label_expression(self, scope: Set[str]):
+        self.parse_label_term(scope=scope)
+        while self.at("|", "&", ":"):
+            self.advance()
+            if self.at(":"):
+                self.advance()
+            self.parse_label_term(scope=scope)
+
+    def parse_label_term(self, scope: Set[str]):
+        while self.accept("!"):
+            pass
+        if self.accept("%"):
+            return
+        if self.accept("("):
+            self.parse_label_expression(scope=scope)
+            self.expect(")")
+            return
+        if self.accept("$"):
+            self.expect("(")
+            self.parse_expression(scope=scope)
+            self.expect(")")
+            return
+        token = self.peek()
+        if token is not None and token.type == PARAMETER:
+            self.advance()
+            if self.at("("):
+                # $any(...) / $all(...)
+                self.advance()
+                self.parse_expression(scope=scope)
+                self.expect(")")
+            return
+        self.parse_name()
+
+    def parse_expression_list(self, scope: Set[str]):
+        while True:
+            self.parse_expression(scope=scope)
+            if not self.accept(","):
+                break
+
+    def parse_expression(self, scope: Set[str]):
+        self.parse_xor(scope=scope)
+        while self.accept_keyword("OR"):
+            self.parse_xor(scope=scope)
+
+    def parse_xor(self, scope: Set[str]):
+        self.parse_and(scope=scope)
+        while self.accept_keyword("XOR"):
+            self.parse_and(scope=scope)
+
+    def parse_and(self, scope: Set[str]):
+        self.parse_not(scope=scope)
+        while self.accept_keyword("AND"):
+            self.parse_not(scope=scope)
+
+    def parse_not(self, scope: Set[str]):
+        while self.accept_keyword("NOT"):
+            pass
+        self.parse_comparison(scope=scope)
+
+    def parse_comparison(self, scope: Set[str]):
+        self.parse_predicate(scope=scope)
+        while self.at(*_COMPARISON_OPERATORS):
+            self.advance()
+            self.parse_predicate(scope=scope)
+
+    def parse_predicate(self, scope: Set[str]):
+        self.parse_additive(scope=scope)
+        while True:
+            if self.at_keyword("STARTS", "ENDS"):
+                self.advance()
+                self.expect_keyword("WITH")
+                self.parse_additive(scope=scope)
+            elif self.accept_keyword("CONTAINS", "IN"):
+                self.parse_additive(scope=scope)
+            elif self.accept_keyword("IS"):
+                self.parse_is_predicate(scope=scope)
+            else:
+                break
+
+    def parse_is_predicate(self, scope: Set[str]):
+        self.accept_keyword("NOT")
+        if self.accept_keyword("NULL"):
+            return
+        if self.accept("::") or self.accept_keyword("TYPED"):
+            self.parse_type()
+            return
+        if self.at_keyword("NFC", "NFD", "NFKC", "NFKD", "NORMALIZED"):
+            self.accept_keyword("NFC", "NFD", "NFKC", "NFKD")
+            self.expect_keyword("NORMALIZED")
+            return
+        self.parse_label_expression(scope=scope)
+
+    def parse_type(self):
+        while True:
+            self.parse_name()
+            while self.at_name() and not self.at_keyword(
+                "NOT", "AND", "OR", "XOR", *_CLAUSE_KEYWORDS
+            ):
+                self.advance()
+            if self.accept("<"):
+                self.parse_type()
+                while self.accept(","):
+                    self.parse_type()
+                self.expect(">")
+            if self.at_keyword("NOT") and self.at_keyword("NULL", offset=1):
+                self.index += 2
+            self.accept("!")
+            if not self.accept("|"):
+                break
+
+    def parse_additive(self, scope: Set[str]):
+        self.parse_multiplicative(scope=scope)
+        while self.at("+", "-", "||"):
+            self.advance()
+            self.parse_multiplicative(scope=scope)
+
+    def parse_multiplicative(self, scope: Set[str]):
+        self.parse_power(scope=scope)
+        while self.at("*", "/", "%"):
+            self.advance()
+            self.parse_power(scope=scope)
+
+    def parse_power(self, scope: Set[str]):
+        self.parse_unary(scope=scope)
+        while self.accept("^"):
+            self.parse_unary(scope=scope)
+
+    def parse_unary(self, scope: Set[str]):
+        while self.accept("+", "-"):
+            pass
+        self.parse_postfix_expression(scope=scope)
+
+    def parse_postfix_expression(self, scope: Set[str], allow_labels: bool = True):
+        is_variable = self.parse_atom(scope=scope)
+        while True:
+            if self.accept("."):
+                self.parse_name()
+            elif self.accept("["):
+                if not self.at(".."):
+                    self.parse_expression(scope=scope)
+                if self.accept(".."):
+                    if not self.at("]"):
+                        self.parse_expression(scope=scope)
+                self.expect("]")
+            elif allow_labels and self.at(":") and not self.at("::"):
+                self.advance()
+                self.parse_label_expression(scope=scope)
+            elif is_variable and self.at("{"):
+                self.parse_map_projection(scope=scope)
+            else:
+                break
+            is_variable = False
+
+    def parse_atom(self, scope: Set[str]) -> bool:
+        """解析原子表达式，返回该原子是否是一个变量。"""
+        token = self.peek()
+        if token is None:
+            raise self.error("此处应为表达式")
+        if token.type in (NUMBER, STRING, PARAMETER):
+            self.advance()
+            return False
+        if self.at("["):
+            self.parse_list(scope=scope)
+            return False
+        if self.at("{"):
+            self.parse_map_literal(scope=scope)
+            return False
+        if self.at("("):
+            self.parse_parenthesized(scope=scope)
+            return False
+        if token.type == ESCAPED_IDENTIFIER:
+            self.advance()
+            self.check_variable(self._name_of(token), scope, token)
+            return True
+        if token.type != IDENTIFIER:
+            raise self.error("此处应为表达式")
+
+        upper = token.upper
+        if upper in _CONSTANTS:
+            self.advance()
+            return False
+        if upper == "CASE":
+            self.parse_case(scope=scope)
+            return False
+        if upper in ("EXISTS", "COUNT", "COLLECT") and self.at("{", offset=1):
+            self.advance()
+            self.parse_subquery_expression(scope=scope)
+            return False
+        if self.is_function_call():
+            self.parse_function_call(scope=scope)
+            return False
+        self.advance()
+        self.check_variable(token.text, scope, token)
+        return True
+
+    def is_function_call(self) -> bool:
+        offset = 1
+        while self.at(".", offset=offset) and self.at_name(offset=offset + 1):
+            offset += 2
+        return self.at("(", offset=offset)
+
+    def parse_function_call(self, scope: Set[str]):
+        name = self.parse_name()
+        while self.accept("."):
+            name += "." + self.parse_name()
+        upper = name.upper()
+        self.expect("(")
+        if (
+            upper in _LIST_PREDICATES
+            and self.at_name()
+            and self.at_keyword("IN", offset=1)
+        ):
+            variable = self.parse_name()
+            self.advance()
+            self.parse_expression(scope=scope)
+            if self.accept_keyword("WHERE"):
+                self.parse_expression(scope=scope | {variable})
+            self.expect(")")
+            return
+        if upper == "REDUCE":
+            accumulator = self.parse_name()
+            self.expect("=")
+            self.parse_expression(scope=scope)
+            self.expect(",")
+            variable = self.parse_name()
+            self.expect_keyword("IN")
+            self.parse_expression(scope=scope)
+            self.expect("|")
+            self.parse_expression(scope=scope | {accumulator, variable})
+            self.expect(")")
+            return
+        if upper in _PATH_FUNCTIONS:
+            self.parse_path(scope=scope, defines=set(scope))
+            self.expect(")")
+            return
+        if upper == "COUNT" and self.accept("*"):
+            self.expect(")")
+            return
+        if upper == "TRIM" and self.has_keyword_before_close("FROM"):
+            # trim([BOTH|LEADING|TRAILING] [chars] FROM string)
+            self.accept_keyword("BOTH", "LEADING", "TRAILING")
+            if not self.at_keyword("FROM"):
+                self.parse_expression(scope=scope)
+            self.expect_keyword("FROM")
+            self.parse_expression(scope=scope)
+            self.expect(")")
+            return
+        self.index -= 1
+        self.parse_arguments(scope=scope)
+
+    def has_keyword_before_close(self, word: str) -> bool:
+        depth = 0
+        for token in self.tokens[self.index :]:
+            if token.text in _BRACKETS:
+                depth += 1
+            elif token.text in _BRACKETS.values():
+                if depth == 0:
+                    return False
+                depth -= 1
+            elif depth == 0 and token.type == IDENTIFIER and token.upper == word:
+                return True
+        return False
+
+    def parse_arguments(self, scope: Set[str], lenient: bool = False):
+        self.expect("(")
+        self.accept_keyword("DISTINCT")
+        while not self.at(")"):
+            if lenient:
+                self.advance()
+                continue
+            self.parse_expression(scope=scope)
+            if not self.accept(","):
+                break
+        self.expect(")")
+
+    def parse_parenthesized(self, scope: Set[str]):
+        # 先尝试解析为模式表达式 (a)-->(b)，失败则回溯为括号表达式
+        start = self.index
+        try:
+            if self.parse_path(scope=scope, defines=set(scope)) > 0:
+                return
+        except CypherParseError:
+            pass
+        self.index = start
+        self.expect("(")
+        self.parse_expression(scope=scope)
+        self.expect(")")
+
+    def parse_list(self, scope: Set[str]):
+        self.expect("[")
+        if self.at_name() and self.at_keyword("IN", offset=1):
+            # 列表推导式 [x IN list WHERE ... | ...]
+            variable = self.parse_name()
+            self.advance()
+            self.parse_expression(scope=scope)
+            inner_scope = scope | {variable}
+            if self.accept_keyword("WHERE"):
+                self.parse_expression(scope=inner_scope)
+            if self.accept("|"):
+                self.parse_expression(scope=inner_scope)
+            self.expect("]")
+            return
+        if self.at("(") or (self.at_name() and self.at("=", offset=1)):
+            # 模式推导式 [(a)-->(b) WHERE ... | ...]
+            start = self.index
+            defines = set(scope)
+            try:
+                self.parse_pattern_part(scope=scope, defines=defines)
+                if self.accept_keyword("WHERE"):
+                    self.parse_expression(scope=defines)
+                self.expect("|")
+                self.parse_expression(scope=defines)
+                self.expect("]")
+                return
+            except CypherParseError:
+                self.index = start
+        while not self.at("]"):
+            self.parse_expression(scope=scope)
+            if not self.accept(","):
+                break
+        self.expect("]")
+
+    def parse_map_literal(self, scope: Set[str]):
+        self.expect("{")
+        while not self.at("}"):
+            self.parse_name()
+            self.expect(":")
+            self.parse_expression(scope=scope)
+            if not self.accept(","):
+                break
+        self.expect("}")
+
+    def parse_map_projection(self, scope: Set[str]):
+        self.expect("{")
+        while not self.at("}"):
+            if self.accept("."):
+                if not self.accept("*"):
+                    self.parse_name()
+            elif self.at_name() and self.at(":", offset=1):
+                self.parse_name()
+                self.advance()
+                self.parse_expression(scope=scope)
+            else:
+                token = self.peek()
+                self.check_variable(self.parse_name(), scope, token)
+            if not self.accept(","):
+                break
+        self.expect("}")
+
+    def parse_case(self, scope: Set[str]):
+        self.expect_keyword("CASE")
+        if not self.at_keyword("WHEN"):
+            self.parse_expression(scope=scope)
+        if not self.at_keyword("WHEN"):
+            raise self.error("CASE 表达式此处应为 WHEN")
+        while self.accept_keyword("WHEN"):
+            self.parse_expression(scope=scope)
+            while self.accept(","):
+                self.parse_expression(scope=scope)
+            self.expect_keyword("THEN")
+            self.parse_expression(scope=scope)
+        if self.accept_keyword("ELSE"):
+            self.parse_expression(scope=scope)
+        self.expect_keyword("END")
+
+    def parse_subquery_expression(self, scope: Set[str]):
+        self.expect("{")
+        if self.at_clause():
+            self.parse_query(scope=scope)
+        else:
+            defines = set(scope)
+            self.parse_pattern_list(scope=scope, defines=defines)
+            if self.accept_keyword("WHERE"):
+                self.parse_expression(scope=defines)
+        self.expect("}")
+
+    def check_variable(self, name: str, scope: Set[str], token: Token):
+        if name not in scope:
+            raise CypherParseError(f"变量 `{name}` 未定义", token.position, self.cypher)
+
+    @staticmethod
+    def _name_of(token: Token) -> str:
+        if token.type == ESCAPED_IDENTIFIER:
+            return token.text[1:-1].replace("``", "`")
+        return token.text
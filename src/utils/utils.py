@@ -1,5 +1,6 @@
+import hashlib
 import json
-from typing import Union
+from typing import Callable, List, Optional, Union
 
 from agno.models.openai import OpenAILike
 from agno.run.response import RunResponse
@@ -9,15 +10,21 @@ from pydantic import BaseModel
 from agent.cypher.cypher_team import CypherTeam
 from agent.cypher.cypher_tree_team import CypherTreeTeam
 from agent.cypher.entity_specifier import EntitySpecifierAgent
-from agent.reflector import ReflectorAgent
+from agent.reflector import Reflections, ReflectorAgent
 from param import Parameter
+from storage.answer_cache import SemanticAnswerCache
+from storage.trajectory_store import SolvedTrajectoryStore
 from tools.cypher import CypherTools
 from tools.neq4j import Neo4jTools
+from utils.budget import budget_tool_hook
+from utils.cypher_lexer import CypherLexError, extract_cypher, tokenize
 
 param = Parameter(config_file_path="./config.yaml")
 
 
-def get_model(temperature: float = 1.0, enable_thinking: bool = False):
+def get_model(
+    temperature: float = 1.0, enable_thinking: bool = False, seed: Optional[int] = None
+):
     return OpenAILike(
         id=param.response_model_name,
         base_url=param.response_base_url,
@@ -28,6 +35,7 @@ def get_model(temperature: float = 1.0, enable_thinking: bool = False):
             }
         },
         temperature=temperature,
+        seed=seed,
     )
 
 
@@ -45,38 +53,61 @@ def get_cypher_team():
     return cypher_team
 
 
-team_tools = [
-    CypherTools(
-        embed_model_name=param.embed_model_name,
-        embed_base_url=param.embed_base_url,
-        embed_api_key=param.embed_api_key,
-    ),
-    Neo4jTools(
-        user=param.DATABASE_USER,
-        password=param.DATABASE_PASSWORD,
-        db_uri=param.DATABASE_URL,
-        database=param.DATABASE_NAME,
-        embed_model_name=param.embed_model_name,
-        embed_base_url=param.embed_base_url,
-        embed_api_key=param.embed_api_key,
-        labels=True,
-        relationships=True,
-        execution=True,
-    ),
-]
-
-
-def get_cypher_tree_team():
+cypher_tools = CypherTools(
+    embed_model_name=param.embed_model_name,
+    embed_base_url=param.embed_base_url,
+    embed_api_key=param.embed_api_key,
+)
+async_cypher_tools = CypherTools(
+    embed_model_name=param.embed_model_name,
+    embed_base_url=param.embed_base_url,
+    embed_api_key=param.embed_api_key,
+    async_search=True,
+    document_store=cypher_tools.document_store,
+)
+neo4j_tools = Neo4jTools(
+    user=param.DATABASE_USER,
+    password=param.DATABASE_PASSWORD,
+    db_uri=param.DATABASE_URL,
+    database=param.DATABASE_NAME,
+    embed_model_name=param.embed_model_name,
+    embed_base_url=param.embed_base_url,
+    embed_api_key=param.embed_api_key,
+    labels=True,
+    relationships=True,
+    execution=True,
+    validation=True,
+    parameterize=True,
+)
+# 语义答案缓存默认关闭，首次使用时才创建，导入时不连接Qdrant
+answer_cache: Optional[SemanticAnswerCache] = None
+trajectory_store = SolvedTrajectoryStore(
+    embed_model_name=param.embed_model_name,
+    embed_base_url=param.embed_base_url,
+    embed_api_key=param.embed_api_key,
+)
+team_tools = [cypher_tools, neo4j_tools]
+async_team_tools = [async_cypher_tools, neo4j_tools]
+
+
+def get_cypher_tree_team(
+    async_tools: bool = False,
+    temperature: float = 0.8,
+    seed: Optional[int] = None,
+    extra_tools: Optional[List[Callable]] = None,
+):
     entity_specifier = EntitySpecifierAgent(
         param=param,
         model=get_model(temperature=0.2),
         retries=3,
+        tool_hooks=[budget_tool_hook],
     )
     cypher_tree_team = CypherTreeTeam(
         param=param,
-        model=get_model(temperature=0.8),
-        tools=team_tools,
+        model=get_model(temperature=temperature, seed=seed),
+        tools=(async_team_tools if async_tools else team_tools) + (extra_tools or []),
         members=[entity_specifier],
+        tool_hooks=[budget_tool_hook],
     )
     return cypher_tree_team
 
@@ -89,6 +120,60 @@ def get_reflector():
     return reflector
 
 
+def get_batch_reflector():
+    reflector = ReflectorAgent(
+        model=get_model(temperature=0.2),
+        retries=3,
+        response_model=Reflections,
+    )
+    return reflector
+
+
+def get_validator():
+    return neo4j_tools
+
+
+def get_answer_cache():
+    global answer_cache
+    if answer_cache is None:
+        answer_cache = SemanticAnswerCache(
+            embed_model_name=param.embed_model_name,
+            embed_base_url=param.embed_base_url,
+            embed_api_key=param.embed_api_key,
+        )
+    return answer_cache
+
+
+def get_trajectory_store():
+    return trajectory_store
+
+
+def candidate_fingerprint(candidate: str) -> str:
+    """计算候选推理状态的指纹，用于合并等价的搜索树节点。
+
+    候选中包含Cypher代码块时只取最后一个Cypher语句，去掉空白、注释和末尾分号后比较；
+    否则比较压缩空白后的全文。
+
+    参数:
+        candidate (str): 团队输出的候选推理状态
+
+    返回:
+        str: 指纹的十六进制sha1值
+    """
+    cypher = extract_cypher(candidate)
+    if cypher is None:
+        content = " ".join(candidate.split())
+    else:
+        try:
+            texts = [token.text for token in tokenize(cypher, keep_trivia=False)]
+            while texts and texts[-1] == ";":
+                texts.pop()
+            content = " ".join(texts)
+        except CypherLexError:
+            content = " ".join(cypher.split())
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
 def get_run_response_content(run_response: Union[RunResponse, TeamRunResponse]):
     if run_response is None:
         return ""
@@ -1,21 +1,49 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.responses import StreamingResponse
 
-from utils.utils import get_run_response_content
+from utils.budget import Budget
+from utils.utils import get_run_response_content, get_validator
 from workflow.nl2cypher import NL2CypherWorkflow
 
 app = FastAPI()
 
-workflow = NL2CypherWorkflow()
-
 
 @app.get("/ask")
-async def ask(question: str):
-    def workflow_streamer():
-        run_response = workflow.run(question=question)
-        for resp in run_response:
-            run_response_content = get_run_response_content(run_response=resp)
-            if run_response_content != "Run started":
-                yield run_response_content
+async def ask(
+    question: str,
+    strategy: str = "lats",
+    time_limit: Optional[float] = None,
+    max_llm_calls: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_db_queries: Optional[int] = None,
+    parallel_leaves: Optional[int] = None,
+    session_id: Optional[str] = None,
+):
+    # One workflow per request keeps the run state of concurrent requests apart; a
+    # request with the session_id of an interrupted search resumes its checkpoint
+    workflow = NL2CypherWorkflow(session_id=session_id)
+    budget = Budget(
+        time_limit=time_limit,
+        max_llm_calls=max_llm_calls,
+        max_tokens=max_tokens,
+        max_db_queries=max_db_queries,
+    )
+
+    async def workflow_streamer():
+        run_response = await workflow.arun(
+            question=question,
+            strategy=strategy,
+            budget=budget,
+            parallel_leaves=parallel_leaves,
+        )
+        yield get_run_response_content(run_response=run_response)
 
     return StreamingResponse(workflow_streamer())
+
+
+@app.get("/metrics")
+async def metrics():
+    # The plan-cache hit rate is a client-side estimate, see QueryMetrics
+    return get_validator().get_metrics()
@@ -0,0 +1,118 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+# Fenced blocks and long lines are the bulky parts of a step (tool results, records)
+_BLOCK_PATTERN = re.compile(r"```[^\n]*\n.*?```|[^\n]{400,}", flags=re.DOTALL)
+_CJK_PATTERN = re.compile(r"[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]")
+HANDLE_PATTERN = re.compile(r"<output:([0-9a-f]{8})>")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count without a tokenizer: one per CJK character, four ASCII characters per token."""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class OutputStore:
+    """Content-addressed LRU store of large outputs removed from compacted trajectories."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._outputs: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, output: str) -> str:
+        handle = hashlib.sha1(output.encode("utf-8")).hexdigest()[:8]
+        with self._lock:
+            self._outputs[handle] = output
+            self._outputs.move_to_end(handle)
+            while len(self._outputs) > self.max_size:
+                self._outputs.popitem(last=False)
+        return f"<output:{handle}>"
+
+    def get(self, handle: str) -> Optional[str]:
+        match = HANDLE_PATTERN.search(handle)
+        key = match.group(1) if match else handle.strip()
+        with self._lock:
+            return self._outputs.get(key)
+
+    def read_output(self, handle: str) -> str:
+        """查看推理轨迹中被句柄代替的完整输出。
+
+        参数:
+            handle (str): 输出句柄，例如 <output:1a2b3c4d>
+
+        返回:
+            str: 完整的输出内容
+        """
+        output = self.get(handle=handle)
+        if output is None:
+            return f"句柄 {handle} 对应的输出已过期，请重新执行相应的操作"
+        return output
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+
+class TrajectoryCompactor:
+    """Caps the trajectory in the expansion prompt at max_tokens.
+
+    The latest recent_steps steps stay verbatim while they fit in max_tokens. In
+    older steps, blocks longer than block_tokens are moved to the output store behind
+    a short handle, and a step still longer than step_tokens keeps only its head and
+    tail. If the trajectory is still over budget, the oldest compacted steps are
+    dropped. Recent steps over max_tokens by themselves, such as one with a large
+    result table, have their large blocks moved behind handles too but are never
+    truncated, so only text outside blocks can still exceed the cap.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        recent_steps: int = 1,
+        step_tokens: int = 400,
+        block_tokens: int = 150,
+        store: Optional[OutputStore] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.recent_steps = recent_steps
+        self.step_tokens = step_tokens
+        self.block_tokens = block_tokens
+        self.store = store if store is not None else OutputStore()
+
+    def compact(self, steps: List[str]) -> str:
+        """Join the steps of a trajectory, oldest first, within the token budget."""
+        split = max(len(steps) - self.recent_steps, 0)
+        recent = steps[split:]
+        if sum(estimate_tokens(step) for step in recent) > self.max_tokens:
+            recent = [_BLOCK_PATTERN.sub(self._offload, step) for step in recent]
+        older = [self.compact_step(step) for step in steps[:split]]
+
+        budget = self.max_tokens - sum(estimate_tokens(step) for step in recent)
+        dropped = 0
+        while older and sum(estimate_tokens(step) for step in older) > budget:
+            older.pop(0)
+            dropped += 1
+        if dropped > 0:
+            older.insert(0, f"[省略了最早的 {dropped} 步推理]")
+        return "\n".join(older + recent)
+
+    def compact_step(self, step: str) -> str:
+        step = _BLOCK_PATTERN.sub(self._offload, step)
+        if estimate_tokens(step) <= self.step_tokens:
+            return step
+        # Keep about step_tokens tokens, split between the head and the tail
+        keep = len(step) * self.step_tokens // estimate_tokens(step)
+        head, tail = step[: keep // 2], step[len(step) - keep // 2 :]
+        return f"{head}\n...[省略 {len(step) - 2 * (keep // 2)} 字]...\n{tail}"
+
+    def _offload(self, match: re.Match) -> str:
+        block = match.group()
+        if estimate_tokens(block) <= self.block_tokens:
+            return block
+        handle = self.store.put(block)
+        preview = block.strip().splitlines()[0][:80]
+        return f"{handle} ({preview} ... 共{len(block)}字，用 read_output 查看完整内容)"
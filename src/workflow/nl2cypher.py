@@ -1,26 +1,98 @@
 import asyncio
+import contextlib
+import hashlib
+import json
 import os
-from typing import Any, Dict, Iterator, List, Literal, Optional, Union
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from uuid import uuid4
 
 from agno.memory.v2.memory import Memory
-from agno.memory.workflow import WorkflowMemory
+from agno.memory.workflow import WorkflowMemory, WorkflowRun
 from agno.run.team import TeamRunResponse
 from agno.storage.base import Storage
 from agno.utils.log import log_error, log_info
 from agno.workflow import RunResponse, Workflow
 
-from agent.reflector import Reflection, ReflectorAgent
+from agent.reflector import Reflection, Reflections, ReflectorAgent
+from storage.answer_cache import SemanticAnswerCache
+from storage.cache import CacheStats, ReflectionCache
+from storage.trajectory_store import SolvedTrajectoryStore
 from storage.yaml import YamlStorage
-from utils.utils import get_cypher_tree_team, get_reflector
+from utils.budget import (
+    Budget,
+    BudgetExceeded,
+    charge_run_response,
+    get_budget,
+    use_budget,
+)
+from utils.utils import (
+    candidate_fingerprint,
+    extract_cypher,
+    get_batch_reflector,
+    get_cypher_tree_team,
+    get_reflector,
+    get_trajectory_store,
+    get_validator,
+)
+from workflow.compaction import TrajectoryCompactor
+from workflow.scorer import HeuristicScorer
+from workflow.strategy import LATSStrategy, SearchStrategy, get_strategy
 from workflow.tree import Node, TreeState
 
+# Caps the concurrent team runs of one search across all expanded leaves
+_generation_semaphore: ContextVar[Optional[asyncio.Semaphore]] = ContextVar(
+    "generation_semaphore", default=None
+)
+
 
 class NL2CypherWorkflow(Workflow):
     reflector = get_reflector()
+    batch_reflection = True
+    pipeline_expansion = True
+    # Leaves the LATS strategy expands at once, spread over the tree by virtual loss
+    parallel_leaves = 1
+    max_frontier = 32
+    # More than one initial candidate puts them under a virtual root, generated
+    # concurrently with temperatures spread over initial_temperature_range
+    initial_candidates = 1
+    initial_temperature_range = (0.4, 1.2)
+    # Caps the trajectory in expansion prompts, None sends it in full
+    trajectory_compactor: Optional[TrajectoryCompactor] = TrajectoryCompactor()
+    # Saves the tree to the session after every strategy iteration so that a search
+    # of the same question in the same session resumes after a crash
+    checkpoint = True
+    max_concurrency = 8
+    validator = get_validator()
+    # Solved questions are answered again by re-executing their Cypher. Off by
+    # default until paraphrase and entity-swap behaviour is evaluated on real
+    # questions; set it to
+    # utils.utils.get_answer_cache() to enable it
+    answer_cache: Optional[SemanticAnswerCache] = None
+    answer_cache_limit = 100
+    # Solved searches are stored and the few_shot_k most similar ones are shown in
+    # the first team prompt of a new question, None disables it
+    trajectory_store: Optional[SolvedTrajectoryStore] = get_trajectory_store()
+    few_shot_k = 3
+    scorer = HeuristicScorer(validator=validator)
     database_dir = "./tmp"
     storage = YamlStorage(
         dir_path=os.path.join(database_dir, "workflow"), mode="workflow"
     )
+    reflection_cache = ReflectionCache(
+        db_file=os.path.join(database_dir, "reflection_cache.db"),
+        namespace=reflector.model.id,
+    )
 
     def __init__(
         self,
@@ -55,20 +127,114 @@ class NL2CypherWorkflow(Workflow):
             telemetry=telemetry,
         )
         self.reflection_prompt = ReflectorAgent.get_prompt()
+        self.batch_reflection_prompt = ReflectorAgent.get_batch_prompt()
+        self.reflection_cache_stats = CacheStats()
 
     def run(
-        self, question: str, search_depth: int = 5, expand_num: int = 3
+        self,
+        question: str,
+        search_depth: Optional[int] = None,
+        expand_num: Optional[int] = None,
+        strategy: str = "lats",
+        budget: Optional[Budget] = None,
+        parallel_leaves: Optional[int] = None,
     ) -> Iterator[Union[RunResponse, TeamRunResponse]]:
         """This is where the main logic of the workflow is implemented."""
         log_info(f"Processing question: {question}")
-        result = self.run_lats(
-            question=question, search_depth=search_depth, expand_num=expand_num
+        search_strategy = self.get_search_strategy(
+            strategy=strategy,
+            search_depth=search_depth,
+            expand_num=expand_num,
+            parallel_leaves=parallel_leaves,
         )
-        log_info(f"LATS algorithm completed. Result: {result}...")
+        result = asyncio.run(
+            self.asearch(question=question, strategy=search_strategy, budget=budget)
+        )
+        log_info(f"{search_strategy.name} search completed. Result: {result}...")
 
         yield RunResponse(run_id=self.run_id, content=result)
 
-    def reflection_chain(
+    async def arun(
+        self,
+        question: str,
+        search_depth: Optional[int] = None,
+        expand_num: Optional[int] = None,
+        strategy: str = "lats",
+        budget: Optional[Budget] = None,
+        parallel_leaves: Optional[int] = None,
+    ) -> RunResponse:
+        """Async counterpart of run for callers that already own an event loop (FastAPI, Gradio).
+
+        Mirrors the bookkeeping of Workflow.run_workflow: the session is read from
+        storage (with the checkpoints of interrupted searches), the run is added to
+        the workflow memory and the session is written back.
+        """
+        self.set_storage_mode()
+        self.set_debug()
+        self.set_workflow_id()
+        self.set_session_id()
+        self.initialize_memory()
+        self.run_id = str(uuid4())
+        self.run_input = {
+            "question": question,
+            "search_depth": search_depth,
+            "expand_num": expand_num,
+            "strategy": strategy,
+            "parallel_leaves": parallel_leaves,
+        }
+        self.run_response = RunResponse(
+            run_id=self.run_id, session_id=self.session_id, workflow_id=self.workflow_id
+        )
+        self.read_from_storage()
+        self.update_agent_session_ids()
+
+        log_info(f"Processing question: {question}")
+        search_strategy = self.get_search_strategy(
+            strategy=strategy,
+            search_depth=search_depth,
+            expand_num=expand_num,
+            parallel_leaves=parallel_leaves,
+        )
+        result = await self.asearch(
+            question=question, strategy=search_strategy, budget=budget
+        )
+        log_info(f"{search_strategy.name} search completed. Result: {result}...")
+
+        self.run_input["budget"] = budget.to_dict() if budget is not None else None
+        self.run_response.content = result
+        if isinstance(self.memory, WorkflowMemory):
+            self.memory.add_run(
+                WorkflowRun(input=self.run_input, response=self.run_response)
+            )
+        elif isinstance(self.memory, Memory):
+            self.memory.add_run(session_id=self.session_id, run=self.run_response)
+        self.write_to_storage()
+        return self.run_response
+
+    @classmethod
+    def get_search_strategy(
+        cls,
+        strategy: str = "lats",
+        search_depth: Optional[int] = None,
+        expand_num: Optional[int] = None,
+        parallel_leaves: Optional[int] = None,
+    ) -> SearchStrategy:
+        """Create the search strategy of a request, keeping its own defaults for unset budgets.
+
+        parallel_leaves only applies to the LATS strategy and defaults to the class attribute.
+        """
+        params = {"search_depth": search_depth, "expand_num": expand_num}
+        if strategy == LATSStrategy.name:
+            params["parallel_leaves"] = (
+                parallel_leaves if parallel_leaves is not None else cls.parallel_leaves
+            )
+        return get_strategy(
+            name=strategy,
+            max_frontier=cls.max_frontier,
+            **{key: value for key, value in params.items() if value is not None},
+        )
+
+    async def areflection_chain(
         self, input: str, candidate: Optional[Union[str, List[str]]] = None
     ) -> Reflection:
         """Generates reflection on Cypher query generation process by analyzing input and candidate.
@@ -95,18 +261,161 @@ class NL2CypherWorkflow(Workflow):
                 candidate_content = (
                     candidate[-1] if isinstance(candidate, list) else candidate
                 )
-
-            message = self.reflection_prompt.format(
-                input=input, candidate=candidate_content
-            )
-            reflection: Reflection = self.reflector.run(message=message).content
-            log_info(f"reflection:{reflection}")
-            return reflection
+                candidate_content, reflection = await asyncio.to_thread(
+                    self.prepare_candidate, candidate=candidate_content
+                )
+                if reflection is not None:
+                    return reflection
+            return await self.areflect(input=input, candidate=candidate_content)
         except Exception as e:
-            log_error(f"Error in reflection_chain: {e!s}", exc_info=True)
+            log_error(f"Error in areflection_chain: {e!s}", exc_info=True)
             return Reflection(plan=f"Error in reflection: {e!s}", score=0, end=False)
 
-    def generate_initial_response(self, state: TreeState) -> TreeState:
+    async def abatch_reflection_chain(
+        self, input: str, candidates: List[str]
+    ) -> List[Reflection]:
+        """Reflects on all sibling candidates of an expansion with a single listwise LLM call.
+
+        Candidates rejected by the heuristic scorer get their synthetic reflection, the
+        rest are scored together so the reflector can compare them. If the batched
+        response cannot be parsed or does not contain one reflection per candidate,
+        each remaining candidate falls back to single-candidate reflection.
+
+        Args:
+            input: Original natural language input from the user
+            candidates: Sibling candidates produced from the same trajectory
+
+        Returns:
+            List[Reflection]: One reflection per candidate, in the order of candidates
+        """
+        reflections: List[Optional[Reflection]] = [None] * len(candidates)
+        pending: List[Tuple[int, str]] = []
+        prepared = await asyncio.gather(
+            *[
+                asyncio.to_thread(self.prepare_candidate, candidate=candidate)
+                for candidate in candidates
+            ],
+            return_exceptions=True,
+        )
+        for index, (candidate, result) in enumerate(zip(candidates, prepared)):
+            if isinstance(result, Exception):
+                log_error(f"Error in abatch_reflection_chain: {result!s}")
+                content, reflection = candidate, None
+            else:
+                content, reflection = result
+            if reflection is None:
+                reflection = self.get_cached_reflection(input=input, candidate=content)
+            if reflection is not None:
+                reflections[index] = reflection
+            else:
+                pending.append((index, content))
+
+        if len(pending) > 1:
+            batch = await self.abatch_reflect(
+                input=input, candidates=[content for _, content in pending]
+            )
+            if batch is not None:
+                for (index, content), reflection in zip(pending, batch):
+                    reflections[index] = reflection
+                    self.reflection_cache.set(
+                        input=input, candidate=content, reflection=reflection
+                    )
+                pending = []
+            else:
+                log_info("Batch reflection failed, fall back to single reflection")
+
+        singles = await asyncio.gather(
+            *[
+                self.areflect(input=input, candidate=content, lookup=False)
+                for _, content in pending
+            ],
+            return_exceptions=True,
+        )
+        for (index, _), reflection in zip(pending, singles):
+            if isinstance(reflection, Exception):
+                log_error(f"Error in abatch_reflection_chain: {reflection!s}")
+                reflection = Reflection(
+                    plan=f"Error in reflection: {reflection!s}", score=0, end=False
+                )
+            reflections[index] = reflection
+        return reflections
+
+    def prepare_candidate(self, candidate: str) -> Tuple[str, Optional[Reflection]]:
+        """Runs the heuristic scorer on a candidate before it is sent to the reflector.
+
+        Returns:
+            Tuple[str, Optional[Reflection]]: The candidate with the heuristic check
+                results appended, and a synthetic reflection if the candidate is
+                rejected without an LLM call
+        """
+        if not candidate:
+            return candidate, None
+        # Obviously broken candidates are scored without a reflection LLM call
+        heuristic = self.scorer.prescore(candidate=candidate)
+        if self.scorer.is_rejected(heuristic):
+            return candidate, heuristic.as_reflection()
+        if heuristic is not None:
+            candidate += "\n\n快速检查结果:\n" + json.dumps(
+                obj=heuristic.to_dict(), ensure_ascii=False, indent=2
+            )
+        return candidate, None
+
+    async def areflect(
+        self, input: str, candidate: str, lookup: bool = True
+    ) -> Reflection:
+        if lookup:
+            reflection = self.get_cached_reflection(input=input, candidate=candidate)
+            if reflection is not None:
+                return reflection
+        message = self.reflection_prompt.format(input=input, candidate=candidate)
+        # A fresh agent per call, concurrent runs must not share agent run state
+        reflector = get_reflector()
+        response = await reflector.arun(message=message)
+        charge_run_response(run_response=response)
+        reflection: Reflection = response.content
+        log_info(f"reflection:{reflection}")
+        if isinstance(reflection, Reflection):
+            self.reflection_cache.set(
+                input=input, candidate=candidate, reflection=reflection
+            )
+        return reflection
+
+    def get_cached_reflection(self, input: str, candidate: str) -> Optional[Reflection]:
+        reflection = self.reflection_cache.get(input=input, candidate=candidate)
+        if reflection is None:
+            self.reflection_cache_stats.misses += 1
+            return None
+        self.reflection_cache_stats.hits += 1
+        log_info(f"reflection (cached):{reflection}")
+        return reflection
+
+    async def abatch_reflect(
+        self, input: str, candidates: List[str]
+    ) -> Optional[List[Reflection]]:
+        candidates_content = "\n\n".join(
+            f"候选{index + 1}：\n{candidate}"
+            for index, candidate in enumerate(candidates)
+        )
+        message = self.batch_reflection_prompt.format(
+            input=input, candidates=candidates_content, num=len(candidates)
+        )
+        try:
+            batch_reflector = get_batch_reflector()
+            run_response = await batch_reflector.arun(message=message)
+            charge_run_response(run_response=run_response)
+            response = run_response.content
+        except Exception as e:
+            log_error(f"Error in abatch_reflect: {e!s}", exc_info=True)
+            return None
+        if not isinstance(response, Reflections) or len(response.reflections) != len(
+            candidates
+        ):
+            log_error(f"Unexpected batch reflection response: {response}")
+            return None
+        log_info(f"batch reflections:{response.reflections}")
+        return response.reflections
+
+    async def agenerate_initial_response(self, state: TreeState) -> TreeState:
         """Generates the initial response and reflection for the conversation flow.
 
         Processes the input state through the Cypher generation team workflow,
@@ -118,79 +427,415 @@ class NL2CypherWorkflow(Workflow):
                 conversation history. Expects state.input to contain the latest
                 user query.
 
+        With initial_candidates > 1 the candidates are generated concurrently under
+        a virtual root without messages, so the search is parallel from depth 0.
+
         Returns:
             TreeState: Updated state containing the root node with initial response,
                 reflection metadata, and original input. Returns empty root node
                 on processing errors.
         """
         state_input = state.input
-        cypher_tree_team = get_cypher_tree_team()
+        if self.initial_candidates > 1:
+            return await self.agenerate_initial_candidates(state=state)
+        cypher_tree_team = get_cypher_tree_team(async_tools=True)
         try:
-            team_response = cypher_tree_team.run(message=state_input)
+            message = await self.aget_initial_message(question=state_input)
+            team_response = await cypher_tree_team.arun(message=message)
+            charge_run_response(run_response=team_response)
             team_response_content = str(team_response.content).strip()
             log_info(f"Initial Response:{team_response_content}")
 
             # Generate reflection
-            reflection = self.reflection_chain(
+            reflection = await self.areflection_chain(
                 input=state_input, candidate=team_response_content
             )
 
             # Create Node with messages as a list containing a single dict
             messages = [team_response_content]
-            root = Node(messages=messages, reflection=reflection)
+            root = Node(
+                messages=messages,
+                reflection=reflection,
+                fingerprint=candidate_fingerprint(team_response_content),
+            )
 
             return TreeState(root=root, input=state_input)
         except Exception as e:
             log_error(f"Error generating initial response: {e!s}", exc_info=True)
             return TreeState(root=None, input=state_input)
 
-    def expand(self, question: str, state: TreeState, num: int) -> TreeState:
-        root = state.root
-        best_candidate: Node = root.best_child if root.children else root
-        reason_trace = "\n".join(best_candidate.get_trajectory())
-        message = f"用户问题:{question}\n\n推理历史:\n{reason_trace}"
+    async def aget_cached_answer(self, question: str) -> Optional[str]:
+        """Answers a question similar to a solved one by re-executing the solved Cypher.
+
+        Only entries solved against the current schema snapshot match. An entry whose
+        Cypher no longer executes is dropped and the question is searched again.
+        """
+        if self.answer_cache is None:
+            return None
+        try:
+            schema_hash = await asyncio.to_thread(self.validator.get_schema_hash)
+            cached = await asyncio.to_thread(
+                self.answer_cache.get, question=question, schema_hash=schema_hash
+            )
+        except Exception as e:
+            log_error(f"Error looking up answer cache: {e!s}", exc_info=True)
+            return None
+        if cached is None:
+            return None
+        log_info(f"Answer cache hit ({cached.score:.3f}): {cached.question}")
+        try:
+            # Re-execute so that the answer reflects the current data
+            records = await asyncio.to_thread(
+                self.validator.fetch_records,
+                cypher=cached.cypher,
+                limit=self.answer_cache_limit,
+            )
+        except Exception as e:
+            log_error(f"Cached Cypher failed, search again: {e!s}")
+            await asyncio.to_thread(
+                self.answer_cache.delete,
+                question=cached.question,
+                schema_hash=schema_hash,
+            )
+            return None
+        result = json.dumps(obj=records, ensure_ascii=False, indent=2)
+        return f"```cypher\n{cached.cypher}\n```\n\n查询结果:\n{result}"
+
+    async def acache_answer(self, question: str, answer: str):
+        """Stores the answer of a solved search in the answer cache."""
+        cypher = extract_cypher(answer)
+        if self.answer_cache is None or cypher is None:
+            return
+        try:
+            schema_hash = await asyncio.to_thread(self.validator.get_schema_hash)
+            await asyncio.to_thread(
+                self.answer_cache.set,
+                question=question,
+                cypher=cypher,
+                answer=answer,
+                schema_hash=schema_hash,
+            )
+        except Exception as e:
+            log_error(f"Error writing answer cache: {e!s}", exc_info=True)
+
+    async def aget_initial_message(self, question: str) -> str:
+        """The first team prompt: the question with the most similar solved examples."""
+        if self.trajectory_store is None or self.few_shot_k <= 0:
+            return question
+        try:
+            schema_hash = await asyncio.to_thread(self.validator.get_schema_hash)
+            examples = await asyncio.to_thread(
+                self.trajectory_store.search,
+                question=question,
+                schema_hash=schema_hash,
+                top_k=self.few_shot_k,
+            )
+        except Exception as e:
+            log_error(f"Error retrieving solved examples: {e!s}", exc_info=True)
+            return question
+        if not examples:
+            return question
+        log_info(f"Few-shot examples: {[example.question for example in examples]}")
+        shots = []
+        for index, example in enumerate(examples, start=1):
+            # The last step repeats the final Cypher, earlier steps may be compacted
+            steps = example.trajectory[:-1]
+            if self.trajectory_compactor is not None:
+                steps = [self.trajectory_compactor.compact_step(step) for step in steps]
+            reason_trace = "\n".join(steps) or "无"
+            shots.append(
+                f"示例{index}:\n问题:{example.question}\n推理过程:\n{reason_trace}\n"
+                f"最终Cypher:\n```cypher\n{example.cypher}\n```"
+            )
+        return (
+            f"用户问题:{question}\n\n"
+            "以下是相似问题的已解决示例，仅供参考，请结合当前问题和图谱模式验证后再使用:\n\n"
+            + "\n\n".join(shots)
+        )
 
-        async def _generate_single_candidate():
-            """Generate One candidate and Reflect on it"""
-            cypher_tree_team = get_cypher_tree_team()
-            result = await cypher_tree_team.arun(message=message)
-            candidate = str(result.content).strip()
-            reflection = self.reflection_chain(input=state.input, candidate=candidate)
-            return candidate, reflection
+    async def astore_trajectory(
+        self, question: str, answer: str, trajectory: List[str]
+    ):
+        """Stores a solved search as a few-shot example for similar questions."""
+        cypher = extract_cypher(answer)
+        if self.trajectory_store is None or cypher is None:
+            return
+        try:
+            schema_hash = await asyncio.to_thread(self.validator.get_schema_hash)
+            await asyncio.to_thread(
+                self.trajectory_store.add,
+                question=question,
+                cypher=cypher,
+                trajectory=trajectory,
+                schema_hash=schema_hash,
+            )
+        except Exception as e:
+            log_error(f"Error storing solved trajectory: {e!s}", exc_info=True)
+
+    @staticmethod
+    def get_checkpoint_key(question: str) -> str:
+        return hashlib.sha256(question.encode("utf-8")).hexdigest()[:16]
 
-        async def _generate_candidates():
-            tasks = [_generate_single_candidate() for _ in range(num)]
-            return await asyncio.gather(*tasks)
+    async def asave_checkpoint(self, state: TreeState):
+        """Stores the search tree of state in the session state of the workflow storage.
 
-        results = asyncio.run(_generate_candidates())
+        Called once per strategy iteration. The tree is serialized on the event loop,
+        where it is not being expanded, and the storage write runs in a thread.
+        """
+        if not self.checkpoint or state.root is None or self.session_id is None:
+            return
+        checkpoints = self.session_state.setdefault("checkpoints", {})
+        checkpoints[self.get_checkpoint_key(question=state.input)] = state.to_dict()
+        try:
+            await asyncio.to_thread(self.write_to_storage)
+        except Exception as e:
+            log_error(f"Error saving checkpoint: {e!s}", exc_info=True)
+
+    def load_checkpoint(self, question: str) -> Optional[TreeState]:
+        """Restores the search tree an interrupted search of question left in the session."""
+        if not self.checkpoint:
+            return None
+        checkpoint = self.session_state.get("checkpoints", {}).get(
+            self.get_checkpoint_key(question=question)
+        )
+        if checkpoint is None:
+            return None
+        try:
+            return TreeState.from_dict(data=checkpoint)
+        except Exception as e:
+            log_error(f"Error loading checkpoint: {e!s}", exc_info=True)
+            return None
+
+    def clear_checkpoint(self, question: str):
+        checkpoints = self.session_state.get("checkpoints", {})
+        if (
+            checkpoints.pop(self.get_checkpoint_key(question=question), None)
+            is not None
+        ):
+            self.write_to_storage()
+
+    def get_reason_trace(self, node: Node) -> str:
+        """The trajectory of node for the expansion prompt, compacted when enabled."""
+        if self.trajectory_compactor is None:
+            return "\n".join(node.get_trajectory())
+        steps = []
+        while node is not None:
+            if node.message_ids:
+                steps.append("\n".join(node.get_messages()))
+            node = node.parent
+        return self.trajectory_compactor.compact(steps=steps[::-1])
+
+    async def agenerate_initial_candidates(self, state: TreeState) -> TreeState:
+        """Generates initial_candidates diverse initial responses under a virtual root."""
+        num = self.initial_candidates
+        low, high = self.initial_temperature_range
+        temperatures = [low + (high - low) * index / (num - 1) for index in range(num)]
+        root = Node(messages=[])
+        state.root = root
+        try:
+            children = await self.aexpand_node(
+                question=state.input,
+                state=state,
+                node=root,
+                num=num,
+                temperatures=temperatures,
+            )
+        except Exception as e:
+            log_error(f"Error generating initial candidates: {e!s}", exc_info=True)
+            children = []
+        if not children:
+            return TreeState(root=None, input=state.input)
+        log_info(f"Initial candidates:{children}")
+        return state
+
+    async def aexpand_node(
+        self,
+        question: str,
+        state: TreeState,
+        node: Node,
+        num: int,
+        temperatures: Optional[List[float]] = None,
+    ) -> List[Node]:
+        """Generates num candidates from the trajectory of node and attaches them as its children.
+
+        With temperatures, candidate i is generated with temperatures[i] and seed i;
+        otherwise every candidate uses the default team model.
+        """
+        reason_trace = self.get_reason_trace(node=node)
+        # The virtual root has no trajectory, its children are initial responses
+        message = (
+            f"用户问题:{question}\n\n推理历史:\n{reason_trace}"
+            if reason_trace
+            else await self.aget_initial_message(question=question)
+        )
+
+        async def _generate_single_candidate(index: int):
+            """Generate One candidate"""
+            semaphore = _generation_semaphore.get()
+            async with semaphore if semaphore is not None else contextlib.nullcontext():
+                budget = get_budget()
+                if budget is not None:
+                    budget.check()
+                team_kwargs = {}
+                if temperatures is not None:
+                    team_kwargs = {"temperature": temperatures[index], "seed": index}
+                if self.trajectory_compactor is not None:
+                    # Resolves the handles of outputs moved out of the trajectory
+                    team_kwargs["extra_tools"] = [
+                        self.trajectory_compactor.store.read_output
+                    ]
+                cypher_tree_team = get_cypher_tree_team(async_tools=True, **team_kwargs)
+                result = await cypher_tree_team.arun(message=message)
+                charge_run_response(run_response=result)
+            return str(result.content).strip()
+
+        if self.pipeline_expansion:
+            child_nodes = await self.apipeline_expand(
+                input=state.input,
+                node=node,
+                generate=_generate_single_candidate,
+                num=num,
+            )
+            return child_nodes
+
+        tasks = [_generate_single_candidate(index) for index in range(num)]
+        candidates = []
+        fingerprints = []
+        duplicates = []
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, BudgetExceeded):
+                log_info(f"Candidate skipped: {result!s}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                fingerprint = candidate_fingerprint(result)
+                # Equivalent states are neither reflected nor expanded twice
+                if (
+                    node.find_transposition(fingerprint) is not None
+                    or fingerprint in fingerprints
+                ):
+                    duplicates.append(fingerprint)
+                    continue
+                candidates.append(result)
+                fingerprints.append(fingerprint)
+        if self.batch_reflection:
+            reflections = await self.abatch_reflection_chain(
+                input=state.input, candidates=candidates
+            )
+        else:
+            reflections = await asyncio.gather(
+                *[
+                    self.areflection_chain(input=state.input, candidate=candidate)
+                    for candidate in candidates
+                ]
+            )
+        results = zip(candidates, reflections, fingerprints)
 
         # Grow tree
         child_nodes = [
             Node(
                 [candidate],
-                parent=best_candidate,
+                parent=node,
                 reflection=reflection,
+                fingerprint=fingerprint,
             )
-            for candidate, reflection in results
+            for candidate, reflection, fingerprint in results
         ]
         log_info(f"expand_nodes:{child_nodes}")
-        best_candidate.children.extend(child_nodes)
-        return state
+        for child_node in child_nodes:
+            node.add_child(child_node)
+        self.merge_transpositions(node=node, fingerprints=duplicates)
+        return child_nodes
+
+    def merge_transpositions(self, node: Node, fingerprints: List[str]):
+        """Credits each duplicate candidate as a visit on the node already holding its state."""
+        for fingerprint in fingerprints:
+            existing = node.find_transposition(fingerprint)
+            if existing is not None:
+                existing.revisit()
+                log_info(f"Merged duplicate candidate into {existing}")
+
+    async def apipeline_expand(
+        self,
+        input: str,
+        node: Node,
+        generate: Callable[[int], Awaitable[str]],
+        num: int,
+    ) -> List[Node]:
+        """Expands a node as a pipeline: each candidate is reflected and attached as soon as it is generated.
+
+        Once a candidate is reflected as solved (end=True), the candidates still in
+        flight are cancelled, so the expansion finishes with the fastest good
+        candidate instead of waiting for the slowest one. Candidates whose state is
+        already in the tree, or already being reflected by a sibling, skip reflection
+        and are merged into the existing node as a visit.
 
-    def should_loop(self, state: TreeState) -> Literal["expand", "end"]:
-        """Determine whether to continue the tree search."""
-        root = state.root
-        if root.is_solved:
-            return "end"
-        if root.height > 5:
-            return "end"
-        return "expand"
+        Args:
+            input: Original natural language input from the user
+            node: Node to expand
+            generate: Coroutine function producing the candidate with the given index
+            num: Number of candidates to generate
 
-    def run_lats(self, question: str, search_depth: int = 5, expand_num: int = 3):
-        """Execute the Language Agent Tree Search (LATS) process for generating Cypher queries.
+        Returns:
+            List[Node]: The child nodes attached to node, in order of completion
+        """
 
-        Implements a multi-step search algorithm that combines language model reasoning with
-        graph-based exploration to refine and validate Cypher query generation.
+        reflecting = set()
+
+        async def _generate_and_reflect(index: int):
+            candidate = await generate(index)
+            fingerprint = candidate_fingerprint(candidate)
+            if (
+                node.find_transposition(fingerprint) is not None
+                or fingerprint in reflecting
+            ):
+                return candidate, fingerprint, None
+            reflecting.add(fingerprint)
+            reflection = await self.areflection_chain(input=input, candidate=candidate)
+            return candidate, fingerprint, reflection
+
+        tasks = [
+            asyncio.create_task(_generate_and_reflect(index)) for index in range(num)
+        ]
+        child_nodes = []
+        duplicates = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    candidate, fingerprint, reflection = await next_done
+                except BudgetExceeded as e:
+                    log_info(f"Candidate skipped: {e!s}")
+                    continue
+                except Exception as e:
+                    log_error(f"Error generating candidate: {e!s}", exc_info=True)
+                    continue
+                if reflection is None:
+                    duplicates.append(fingerprint)
+                    continue
+                child_node = Node(
+                    [candidate],
+                    parent=node,
+                    reflection=reflection,
+                    fingerprint=fingerprint,
+                )
+                node.add_child(child_node)
+                child_nodes.append(child_node)
+                log_info(f"expand_node:{child_node}")
+                if reflection.end:
+                    log_info("Solved candidate found, cancel in-flight candidates")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        # Duplicates of a sibling are merged once the sibling has been attached
+        self.merge_transpositions(node=node, fingerprints=duplicates)
+        return child_nodes
+
+    async def arun_lats(
+        self, question: str, search_depth: int = 5, expand_num: int = 3
+    ) -> str:
+        """Execute the Language Agent Tree Search (LATS) process for generating Cypher queries.
 
         Args:
             question: Natural language input describing the user's question
@@ -200,25 +845,83 @@ class NL2CypherWorkflow(Workflow):
         Returns:
             str: The final validated Cypher query string or error message
         """
-        state = TreeState(root=None, input=question)
-        state = self.generate_initial_response(state=state)
-        if not isinstance(state, TreeState) or state.root is None:
-            return "Failed to generate initial response due to an unexpected error."
+        strategy = LATSStrategy(
+            search_depth=search_depth,
+            expand_num=expand_num,
+            parallel_leaves=self.parallel_leaves,
+        )
+        return await self.asearch(question=question, strategy=strategy)
+
+    async def asearch(
+        self,
+        question: str,
+        strategy: SearchStrategy,
+        budget: Optional[Budget] = None,
+    ) -> str:
+        """Answer a question by growing a search tree with the given strategy.
+
+        Implements a multi-step search algorithm that combines language model reasoning with
+        graph-based exploration to refine and validate Cypher query generation.
 
-        for depth in range(search_depth):
-            action = self.should_loop(state)
-            if action == "end":
-                log_info(f"Search ended after {depth + 1} depth")
-                break
-            state = self.expand(question=question, state=state, num=expand_num)
+        Args:
+            question: Natural language input describing the user's question
+            strategy: Search strategy deciding which nodes to expand and when to stop
+            budget: Optional cost and latency budget; once it runs out the search
+                stops and the best solution found so far is returned
 
+        Returns:
+            str: The final validated Cypher query string or error message
+        """
+        log_info(f"Search strategy: {strategy}")
+        cached_answer = await self.aget_cached_answer(question=question)
+        if cached_answer is not None:
+            return cached_answer
+        self.reflection_cache_stats = CacheStats()
+        _generation_semaphore.set(asyncio.Semaphore(self.max_concurrency))
+        with use_budget(budget=budget):
+            if budget is not None:
+                budget.start()
+            state = self.load_checkpoint(question=question)
+            if state is not None:
+                log_info(f"Resume search from checkpoint: {state.root.size} nodes")
+            else:
+                state = TreeState(root=None, input=question)
+                state = await self.agenerate_initial_response(state=state)
+                if not isinstance(state, TreeState) or state.root is None:
+                    return "Failed to generate initial response due to an unexpected error."
+                await self.asave_checkpoint(state=state)
+
+            try:
+                # The tree grows in place, so a timed out search keeps its nodes
+                await asyncio.wait_for(
+                    strategy.search(workflow=self, question=question, state=state),
+                    timeout=budget.remaining_seconds if budget is not None else None,
+                )
+            except asyncio.TimeoutError:
+                log_info("Search stopped: time budget exhausted")
+
+        log_info(f"Reflection cache hit rate: {self.reflection_cache_stats}")
+        if state.root is not None:
+            log_info(f"Merged duplicate candidates: {state.root.transposition_hits}")
+        if budget is not None:
+            log_info(f"Budget usage: {budget.to_dict()}")
+        log_info(f"Neo4j query metrics: {self.validator.get_metrics()}")
         if not isinstance(state, TreeState) or state.root is None:
             return "No valid solution found due to an error in the search process."
 
-        solution_node = state.root.get_best_solution()
+        solution_node = strategy.get_solution(state=state)
         best_trajectory = solution_node.get_trajectory(include_reflections=False)
+        solved = solution_node.reflection is not None and solution_node.reflection.end
+        # Free the finished tree now instead of waiting for the cycle collector
+        state.root.release()
+        self.clear_checkpoint(question=question)
         if not best_trajectory:
             return "No solution found in the search process."
 
         result = best_trajectory[-1]
+        if solved:
+            await self.acache_answer(question=question, answer=result)
+            await self.astore_trajectory(
+                question=question, answer=result, trajectory=best_trajectory
+            )
         return result
@@ -0,0 +1,188 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agno.utils.log import log_error, log_info
+from neo4j.exceptions import ClientError
+
+from agent.reflector import Reflection
+from tools.neq4j import Neo4jTools
+from utils.cypher_lexer import string_literals
+from utils.cypher_parser import check_cypher
+from utils.utils import extract_cypher
+
+PARSE_ERROR_SCORE = 0
+EXPLAIN_ERROR_SCORE = 1
+EXECUTION_ERROR_SCORE = 2
+UNKNOWN_ENTITY_SCORE = 3
+# An empty result may be the right answer ("有没有…"), so it is not rejected by the
+# default threshold unless the entities of the Cypher are not in the graph either
+EMPTY_RESULT_SCORE = 4
+MISSING_ENTITY_SCORE = 5
+PASSED_SCORE = 7
+
+
+@dataclass
+class HeuristicScore:
+    score: int
+    reasons: List[str] = field(default_factory=list)
+    validation: Optional[Dict[str, Any]] = None
+    result_rows: Optional[int] = None
+    missing_entities: List[str] = field(default_factory=list)
+
+    def as_reflection(self) -> Reflection:
+        return Reflection(
+            plan="候选推理状态未通过快速检查，需要修正: " + "；".join(self.reasons),
+            score=self.score,
+            end=False,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "score": self.score,
+            "reasons": self.reasons,
+            "validation": self.validation,
+            "result_rows": self.result_rows,
+            "missing_entities": self.missing_entities,
+        }
+
+
+class HeuristicScorer:
+    """Scores a candidate with cheap execution-grounded checks before LLM reflection.
+
+    The checks run from cheapest to most expensive and stop at the first failure:
+    offline parse, EXPLAIN, read-only execution of the first rows, and whether the
+    entities mapped into the Cypher (its string literals) show up in the result. An
+    empty result is only rejected when those entities are not in the graph at all;
+    otherwise the reflector decides whether no rows is the answer.
+    """
+
+    def __init__(
+        self,
+        validator: Neo4jTools,
+        threshold: int = 4,
+        execute: bool = True,
+        fetch_limit: int = 10,
+    ):
+        self.validator = validator
+        self.threshold = threshold
+        self.execute = execute
+        self.fetch_limit = fetch_limit
+
+    def score(self, candidate: str) -> Optional[HeuristicScore]:
+        """Runs the heuristic checks on the last Cypher statement of a candidate.
+
+        Args:
+            candidate: Candidate reasoning state produced by the Cypher team
+
+        Returns:
+            Optional[HeuristicScore]: The heuristic score, or None if the candidate
+                contains no Cypher and has to be judged by the reflector alone
+        """
+        cypher = extract_cypher(text=candidate)
+        if cypher is None:
+            return None
+
+        parse_error = check_cypher(cypher=cypher)
+        if parse_error is not None:
+            return HeuristicScore(
+                score=PARSE_ERROR_SCORE,
+                reasons=[f"Cypher语句存在语法错误: {parse_error}"],
+            )
+
+        try:
+            validation = self.validator.explain_cypher(cypher=cypher)
+        except Exception as e:
+            log_error(f"Error in explain_cypher: {e!s}")
+            validation = None
+        if validation is not None and not validation["valid"]:
+            return HeuristicScore(
+                score=EXPLAIN_ERROR_SCORE,
+                reasons=[
+                    "Cypher语句无法通过EXPLAIN: " + "；".join(validation["errors"])
+                ],
+                validation=validation,
+            )
+        if not self.execute:
+            return HeuristicScore(score=PASSED_SCORE, validation=validation)
+
+        try:
+            records = self.validator.fetch_records(
+                cypher=cypher, limit=self.fetch_limit
+            )
+        except ClientError as e:
+            return HeuristicScore(
+                score=EXECUTION_ERROR_SCORE,
+                reasons=[f"Cypher语句执行失败: {e.message}"],
+                validation=validation,
+            )
+        except Exception as e:
+            log_error(f"Error in fetch_records: {e!s}")
+            return HeuristicScore(score=PASSED_SCORE, validation=validation)
+        if len(records) == 0:
+            return self.score_empty_result(cypher=cypher, validation=validation)
+
+        result_text = json.dumps(obj=records, ensure_ascii=False, default=str)
+        missing_entities = [
+            literal
+            for literal in string_literals(cypher=cypher)
+            if literal.strip() and literal not in result_text
+        ]
+        if len(missing_entities) > 0:
+            return HeuristicScore(
+                score=MISSING_ENTITY_SCORE,
+                reasons=[f"查询结果中没有出现实体: {', '.join(missing_entities)}"],
+                validation=validation,
+                result_rows=len(records),
+                missing_entities=missing_entities,
+            )
+        return HeuristicScore(
+            score=PASSED_SCORE, validation=validation, result_rows=len(records)
+        )
+
+    def score_empty_result(
+        self, cypher: str, validation: Optional[Dict[str, Any]]
+    ) -> HeuristicScore:
+        """Rejects an empty result only if entities of the Cypher are missing from the graph."""
+        literals = [
+            literal for literal in string_literals(cypher=cypher) if literal.strip()
+        ]
+        try:
+            missing_entities = self.validator.find_missing_entities(names=literals)
+        except Exception as e:
+            log_error(f"Error in find_missing_entities: {e!s}")
+            missing_entities = None
+        if missing_entities:
+            return HeuristicScore(
+                score=UNKNOWN_ENTITY_SCORE,
+                reasons=[
+                    "Cypher语句的查询结果为空，且图中没有这些实体: "
+                    + ", ".join(missing_entities)
+                    + "，检查实体名称是否正确"
+                ],
+                validation=validation,
+                result_rows=0,
+                missing_entities=missing_entities,
+            )
+        return HeuristicScore(
+            score=EMPTY_RESULT_SCORE,
+            reasons=[
+                "Cypher语句的查询结果为空，如果问题并非询问是否存在，检查标签和关系方向是否正确"
+            ],
+            validation=validation,
+            result_rows=0,
+        )
+
+    def prescore(self, candidate: str) -> Optional[HeuristicScore]:
+        """Like score, but never raises; logs candidates that fall below the threshold."""
+        try:
+            heuristic = self.score(candidate=candidate)
+        except Exception as e:
+            log_error(f"Error in heuristic scoring: {e!s}", exc_info=True)
+            return None
+        if heuristic is not None and heuristic.score < self.threshold:
+            log_info(f"Candidate rejected by heuristic scorer: {heuristic.reasons}")
+        return heuristic
+
+    def is_rejected(self, heuristic: Optional[HeuristicScore]) -> bool:
+        return heuristic is not None and heuristic.score < self.threshold
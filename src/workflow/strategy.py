@@ -0,0 +1,304 @@
+import asyncio
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Type
+
+from agno.utils.log import log_info
+
+from utils.budget import get_budget
+from workflow.tree import Node, TreeState
+
+if TYPE_CHECKING:
+    from workflow.nl2cypher import NL2CypherWorkflow
+
+
+class SearchStrategy(ABC):
+    """How the workflow grows the search tree after the initial response.
+
+    Every strategy starts from the tree returned by the initial response and expands
+    nodes through NL2CypherWorkflow.aexpand_node; they differ in which nodes they
+    expand and when they stop. With max_frontier the lowest-value leaves are pruned
+    after every expansion, which bounds the memory of a search.
+    """
+
+    name: str = ""
+
+    def __init__(
+        self,
+        search_depth: int = 5,
+        expand_num: int = 3,
+        max_frontier: Optional[int] = None,
+    ):
+        self.search_depth = search_depth
+        self.expand_num = expand_num
+        self.max_frontier = max_frontier
+
+    @abstractmethod
+    async def search(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ) -> TreeState:
+        """Grow the tree of state and return it."""
+
+    def prune(self, state: TreeState):
+        """Drop the lowest-value subtrees beyond max_frontier leaves."""
+        if self.max_frontier is None:
+            return
+        removed = state.root.prune(max_frontier=self.max_frontier)
+        if removed > 0:
+            log_info(f"Pruned {removed} nodes, {state.root.size} nodes left")
+
+    async def end_iteration(self, workflow: "NL2CypherWorkflow", state: TreeState):
+        """Prune the tree and checkpoint it once per iteration, after all its expansions."""
+        self.prune(state=state)
+        await workflow.asave_checkpoint(state=state)
+
+    def should_loop(self, state: TreeState) -> Literal["expand", "end"]:
+        """Determine whether to continue the tree search."""
+        root = state.root
+        if root.is_solved:
+            return "end"
+        # A virtual root (no messages) is not a reasoning step
+        height = root.height if root.message_ids else root.height - 1
+        if height > self.search_depth:
+            return "end"
+        budget = get_budget()
+        if budget is not None and budget.exhausted:
+            log_info(f"Search stopped: {budget.exhausted_reason}")
+            return "end"
+        return "expand"
+
+    def get_solution(self, state: TreeState) -> Node:
+        """Return the node whose last message answers the question."""
+        solution = state.root.get_best_solution()
+        if solution is state.root and not solution.message_ids and solution.children:
+            # Unsolved search under a virtual root, answer with the best initial branch
+            return max(solution.children, key=lambda node: node.value)
+        return solution
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__dict__})"
+
+
+class LATSStrategy(SearchStrategy):
+    """Language Agent Tree Search: expand the leaves with the highest UCT.
+
+    With parallel_leaves > 1 the top leaves are expanded at once, spread over the
+    tree by virtual loss (parallel MCTS).
+    """
+
+    name = "lats"
+
+    def __init__(
+        self,
+        search_depth: int = 5,
+        expand_num: int = 3,
+        max_frontier: Optional[int] = None,
+        parallel_leaves: int = 1,
+    ):
+        super().__init__(
+            search_depth=search_depth,
+            expand_num=expand_num,
+            max_frontier=max_frontier,
+        )
+        self.parallel_leaves = parallel_leaves
+
+    async def search(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ) -> TreeState:
+        for depth in range(self.search_depth):
+            if self.should_loop(state) == "end":
+                log_info(f"Search ended after {depth + 1} depth")
+                break
+            await self.expand(workflow=workflow, question=question, state=state)
+            await self.end_iteration(workflow=workflow, state=state)
+        return state
+
+    async def expand(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ):
+        root = state.root
+        if self.parallel_leaves <= 1 or not root.children:
+            best_candidate: Node = root.best_child if root.children else root
+            await workflow.aexpand_node(
+                question=question, state=state, node=best_candidate, num=self.expand_num
+            )
+            return
+
+        # Parallel MCTS: expand the top leaves at once, spread out by virtual loss
+        leaves = root.select_leaves(k=self.parallel_leaves)
+        log_info(f"Expand {len(leaves)} leaves in parallel: {leaves}")
+        try:
+            await asyncio.gather(
+                *[
+                    workflow.aexpand_node(
+                        question=question, state=state, node=leaf, num=self.expand_num
+                    )
+                    for leaf in leaves
+                ]
+            )
+        finally:
+            for leaf in leaves:
+                leaf.remove_virtual_loss()
+
+
+class BeamStrategy(SearchStrategy):
+    """Beam search: expand every node of the beam, keep the beam_width best children."""
+
+    name = "beam"
+
+    def __init__(
+        self,
+        search_depth: int = 3,
+        expand_num: int = 2,
+        max_frontier: Optional[int] = None,
+        beam_width: int = 2,
+    ):
+        super().__init__(
+            search_depth=search_depth,
+            expand_num=expand_num,
+            max_frontier=max_frontier,
+        )
+        self.beam_width = beam_width
+
+    async def search(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ) -> TreeState:
+        beam = [state.root]
+        for depth in range(self.search_depth):
+            if self.should_loop(state) == "end" or len(beam) == 0:
+                log_info(f"Search ended after {depth + 1} depth")
+                break
+            children = await asyncio.gather(
+                *[
+                    workflow.aexpand_node(
+                        question=question,
+                        state=state,
+                        node=node,
+                        num=self.expand_num,
+                    )
+                    for node in beam
+                ]
+            )
+            candidates = [child for nodes in children for child in nodes]
+            beam = sorted(candidates, key=lambda node: node.value, reverse=True)[
+                : self.beam_width
+            ]
+            await self.end_iteration(workflow=workflow, state=state)
+            beam = [node for node in beam if not node.is_pruned]
+        return state
+
+    def get_solution(self, state: TreeState) -> Node:
+        return _best_terminal(state=state)
+
+
+class GreedyStrategy(SearchStrategy):
+    """Greedy best-first search: always expand the unexpanded node with the highest value.
+
+    search_depth is the number of expansions.
+    """
+
+    name = "greedy"
+
+    def __init__(
+        self,
+        search_depth: int = 4,
+        expand_num: int = 1,
+        max_frontier: Optional[int] = None,
+    ):
+        super().__init__(
+            search_depth=search_depth,
+            expand_num=expand_num,
+            max_frontier=max_frontier,
+        )
+
+    def should_loop(self, state: TreeState) -> Literal["expand", "end"]:
+        budget = get_budget()
+        if budget is not None and budget.exhausted:
+            log_info(f"Search stopped: {budget.exhausted_reason}")
+            return "end"
+        return "end" if state.root.is_solved else "expand"
+
+    async def search(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ) -> TreeState:
+        counter = itertools.count()
+        frontier = [(-state.root.value, next(counter), state.root)]
+        for step in range(self.search_depth):
+            while frontier and frontier[0][2].is_pruned:
+                heapq.heappop(frontier)
+            if self.should_loop(state) == "end" or len(frontier) == 0:
+                log_info(f"Search ended after {step + 1} expansions")
+                break
+            _, _, node = heapq.heappop(frontier)
+            children = await workflow.aexpand_node(
+                question=question,
+                state=state,
+                node=node,
+                num=self.expand_num,
+            )
+            for child in children:
+                heapq.heappush(frontier, (-child.value, next(counter), child))
+            await self.end_iteration(workflow=workflow, state=state)
+        return state
+
+    def get_solution(self, state: TreeState) -> Node:
+        return _best_terminal(state=state)
+
+
+class SingleShotStrategy(SearchStrategy):
+    """Only the initial response, for questions that need no search."""
+
+    name = "single"
+
+    def __init__(
+        self,
+        search_depth: int = 0,
+        expand_num: int = 0,
+        max_frontier: Optional[int] = None,
+    ):
+        super().__init__(
+            search_depth=search_depth,
+            expand_num=expand_num,
+            max_frontier=max_frontier,
+        )
+
+    async def search(
+        self, workflow: "NL2CypherWorkflow", question: str, state: TreeState
+    ) -> TreeState:
+        return state
+
+
+STRATEGIES: Dict[str, Type[SearchStrategy]] = {
+    strategy.name: strategy
+    for strategy in (LATSStrategy, BeamStrategy, GreedyStrategy, SingleShotStrategy)
+}
+
+
+def get_strategy(name: str = "lats", **kwargs) -> SearchStrategy:
+    """Create a search strategy by name with its own budget parameters.
+
+    Args:
+        name: One of "lats", "beam", "greedy" and "single"
+        **kwargs: Parameters of the strategy, e.g. search_depth, expand_num and
+            max_frontier
+
+    Returns:
+        SearchStrategy: The strategy instance
+    """
+    if name not in STRATEGIES:
+        raise ValueError(
+            f"Unknown search strategy {name!r}, expected one of {list(STRATEGIES)}"
+        )
+    return STRATEGIES[name](**kwargs)
+
+
+def _best_terminal(state: TreeState) -> Node:
+    """The best solved leaf if there is one, otherwise the leaf with the highest value."""
+    root = state.root
+    if root.is_solved:
+        return root.get_best_solution()
+    leaves: List[Node] = [
+        node for node in [root] + root._get_all_children() if node.is_terminal
+    ]
+    return max(leaves, key=lambda node: node.value)
@@ -1,24 +1,136 @@
+import heapq
+import itertools
 import math
 from collections import deque
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from agent.reflector import Reflection
 
 
+class MessageArena:
+    """Interns the messages of one search tree so that nodes only store integer ids.
+
+    Messages are reference counted, so the messages of pruned nodes are released and
+    their ids reused.
+    """
+
+    __slots__ = ("_messages", "_ids", "_refs", "_free")
+
+    def __init__(self) -> None:
+        self._messages: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._refs: List[int] = []
+        self._free: List[int] = []
+
+    def intern(self, message: str) -> int:
+        message_id = self._ids.get(message)
+        if message_id is None:
+            if self._free:
+                message_id = self._free.pop()
+                self._messages[message_id] = message
+            else:
+                message_id = len(self._messages)
+                self._messages.append(message)
+                self._refs.append(0)
+            self._ids[message] = message_id
+        self._refs[message_id] += 1
+        return message_id
+
+    def release(self, message_id: int):
+        self._refs[message_id] -= 1
+        if self._refs[message_id] == 0:
+            del self._ids[self._messages[message_id]]
+            self._messages[message_id] = None
+            self._free.append(message_id)
+
+    def clear(self):
+        self._messages.clear()
+        self._ids.clear()
+        self._refs.clear()
+        self._free.clear()
+
+    def __getitem__(self, message_id: int) -> str:
+        return self._messages[message_id]
+
+    def __len__(self) -> int:
+        return len(self._messages) - len(self._free)
+
+
+class _TreeIndex:
+    """Tree-wide state shared by all nodes of one tree."""
+
+    __slots__ = (
+        "root",
+        "arena",
+        "uct_heap",
+        "heap_counter",
+        "solutions",
+        "transpositions",
+        "transposition_hits",
+    )
+
+    def __init__(self, root: "Node") -> None:
+        self.root = root
+        self.arena = MessageArena()
+        self.uct_heap: List[Tuple[float, int, int, Node]] = []
+        self.heap_counter = itertools.count()
+        self.solutions: List[Node] = []
+        # Transposition table: candidate fingerprint -> first node with that state
+        self.transpositions: Dict[str, Node] = {}
+        self.transposition_hits = 0
+
+
 class Node:
+    __slots__ = (
+        "parent",
+        "children",
+        "value",
+        "visits",
+        "virtual_loss",
+        "reflection",
+        "depth",
+        "fingerprint",
+        "message_ids",
+        "_reflection_message_id",
+        "_trajectory_ids",
+        "_plain_trajectory_ids",
+        "_height",
+        "_size",
+        "_index",
+        "_uct_version",
+        "_is_solved",
+    )
+
     def __init__(
         self,
         messages: List[str],
         reflection: Optional[Reflection] = None,
         parent: Optional["Node"] = None,
+        fingerprint: Optional[str] = None,
     ):
-        self.messages = messages
         self.parent = parent
         self.children: List[Node] = []
         self.value = 0.0
         self.visits = 0
+        self.virtual_loss = 0
         self.reflection = reflection
         self.depth = parent.depth + 1 if parent is not None else 1
+        self._index = parent._index if parent is not None else _TreeIndex(root=self)
+        self.fingerprint = fingerprint
+        if fingerprint is not None:
+            self._index.transpositions.setdefault(fingerprint, self)
+        arena = self._index.arena
+        self.message_ids = tuple(arena.intern(message) for message in messages)
+        self._reflection_message_id = (
+            arena.intern(reflection.as_message()) if reflection else None
+        )
+        # Trajectories with and without reflections, built on first use
+        self._trajectory_ids: Optional[Tuple[int, ...]] = None
+        self._plain_trajectory_ids: Optional[Tuple[int, ...]] = None
+        # Subtree statistics, kept up to date by add_child
+        self._height = 1
+        self._size = 1
+        self._uct_version = 0
         self._is_solved = reflection.end if reflection else False
         if self._is_solved:
             self._mark_tree_as_solved()
@@ -28,6 +140,15 @@ class Node:
     def __repr__(self) -> str:
         return f"<Node value={self.value:.2f}, visits={self.visits}, depth={self.depth}, is_solved={self._is_solved}>"
 
+    @property
+    def messages(self) -> List[str]:
+        arena = self._index.arena
+        return [arena[message_id] for message_id in self.message_ids]
+
+    @property
+    def arena(self) -> MessageArena:
+        return self._index.arena
+
     @property
     def is_solved(self) -> bool:
         """If any solutions exist, we can end the search."""
@@ -37,11 +158,18 @@ class Node:
     def is_terminal(self):
         return not self.children
 
+    @property
+    def is_pruned(self) -> bool:
+        """Whether this node was removed from its tree by prune or release."""
+        return self.parent is None and self._index.root is not self
+
     @property
     def best_child(self):
         """Select the child with the highest UCT to search next."""
         if not self.children:
             return None
+        if self.parent is None:
+            return self._pop_best_uct()
         all_nodes = self._get_all_children()
         return max(all_nodes, key=lambda child: child.upper_confidence_bound())
 
@@ -55,21 +183,94 @@ class Node:
     @property
     def height(self) -> int:
         """Check for how far we've rolled out the tree."""
-        if self.children:
-            return 1 + max([child.height for child in self.children])
-        return 1
+        return self._height
+
+    @property
+    def size(self) -> int:
+        """Number of nodes in this subtree, including this node."""
+        return self._size
+
+    def add_child(self, child: "Node"):
+        """Attach a newly created child and update the subtree statistics incrementally."""
+        self.children.append(child)
+        node, height = self, child._height + 1
+        while node:
+            node._size += child._size
+            if height > node._height:
+                node._height = height
+            height = node._height + 1
+            node = node.parent
+        self._push_uct(child)
+        if child.reflection is not None and child.reflection.end:
+            self._index.solutions.append(child)
+
+    @property
+    def transposition_hits(self) -> int:
+        """Number of duplicate candidates merged into existing nodes of this tree."""
+        return self._index.transposition_hits
+
+    def find_transposition(self, fingerprint: str) -> Optional["Node"]:
+        """Return the node of this tree that already holds the state with fingerprint."""
+        return self._index.transpositions.get(fingerprint)
+
+    def revisit(self):
+        """Count a duplicate of this node's state as another visit with the same reward.
+
+        Equivalent candidates reach the same state, so instead of reflecting and
+        expanding the duplicate as a new branch its visit is credited to this node.
+        """
+        self._index.transposition_hits += 1
+        reward = self.reflection.normalized_score if self.reflection else self.value
+        self.backpropagate(reward)
 
     def upper_confidence_bound(self, exploration_weight=1.0):
         """Return the UCT score. This helps balance exploration vs. exploitation of a branch."""
         if self.parent is None:
             raise ValueError("Cannot obtain UCT from root node")
-        if self.visits == 0:
+        # Pending expansions count as visits with zero reward (virtual loss)
+        visits = self.visits + self.virtual_loss
+        if visits == 0:
             return self.value
         # Encourages exploitation of high-value trajectories
-        average_reward = self.value / self.visits
-        exploration_term = math.sqrt(math.log(self.parent.visits) / self.visits)
+        average_reward = self.value / visits
+        parent_visits = self.parent.visits + self.parent.virtual_loss
+        exploration_term = math.sqrt(math.log(parent_visits) / visits)
         return average_reward + exploration_weight * exploration_term
 
+    def select_leaves(self, k: int) -> List["Node"]:
+        """Select up to k distinct nodes to expand in parallel.
+
+        Each selected node gets a virtual loss along its path to the root, which lowers
+        the UCT of that branch so that the following selections spread out. Call
+        remove_virtual_loss on every selected node once its expansion is done.
+        """
+        selected: List[Node] = []
+        excluded: Set[int] = set()
+        while len(selected) < min(k, self._size - 1):
+            if self.parent is None:
+                node = self._pop_best_uct(excluded=excluded)
+            else:
+                node = max(
+                    (n for n in self._get_all_children() if id(n) not in excluded),
+                    key=lambda child: child.upper_confidence_bound(),
+                )
+            if node is None:
+                break
+            node.add_virtual_loss()
+            selected.append(node)
+            excluded.add(id(node))
+        return selected
+
+    def add_virtual_loss(self, loss: int = 1):
+        node = self
+        while node:
+            node.virtual_loss += loss
+            node = node.parent
+        self._refresh_uct()
+
+    def remove_virtual_loss(self, loss: int = 1):
+        self.add_virtual_loss(loss=-loss)
+
     def backpropagate(self, reward: float):
         """Update the score of this node and its parents."""
         node = self
@@ -77,23 +278,129 @@ class Node:
             node.visits += 1
             node.value = (node.value * (node.visits - 1) + reward) / node.visits
             node = node.parent
+        self._refresh_uct()
 
     def get_messages(self, include_reflections: bool = True):
-        if include_reflections and self.reflection:
-            return self.messages + [self.reflection.as_message()]
-        return self.messages
+        arena = self._index.arena
+        return [
+            arena[message_id]
+            for message_id in self._get_message_ids(
+                include_reflections=include_reflections
+            )
+        ]
 
     def get_trajectory(self, include_reflections: bool = True) -> List[str]:
         """Get messages representing this search branch."""
-        messages = []
-        node = self
-        while node:
-            messages.extend(
-                node.get_messages(include_reflections=include_reflections)[::-1]
+        arena = self._index.arena
+        return [
+            arena[message_id]
+            for message_id in self.get_trajectory_ids(
+                include_reflections=include_reflections
+            )
+        ]  # root solution, reflection, child 1, ...
+
+    def get_trajectory_ids(self, include_reflections: bool = True) -> Tuple[int, ...]:
+        """Get the arena ids of the messages of this search branch.
+
+        A node's messages never change, so each node caches its trajectory once and
+        children extend the cached prefix of their parent instead of walking up again.
+        """
+        trajectory_ids = (
+            self._trajectory_ids if include_reflections else self._plain_trajectory_ids
+        )
+        if trajectory_ids is None:
+            prefix = (
+                self.parent.get_trajectory_ids(include_reflections=include_reflections)
+                if self.parent is not None
+                else ()
+            )
+            trajectory_ids = prefix + self._get_message_ids(
+                include_reflections=include_reflections
             )
+            if include_reflections:
+                self._trajectory_ids = trajectory_ids
+            else:
+                self._plain_trajectory_ids = trajectory_ids
+        return trajectory_ids
+
+    def _get_message_ids(self, include_reflections: bool = True) -> Tuple[int, ...]:
+        if include_reflections and self._reflection_message_id is not None:
+            return self.message_ids + (self._reflection_message_id,)
+        return self.message_ids
+
+    def prune(self, max_frontier: int) -> int:
+        """Drop the lowest-value leaves until at most max_frontier leaves remain.
+
+        A parent left without children becomes a leaf and competes with the others, so
+        whole low-value branches are dropped bottom-up. Solved nodes and nodes that are
+        being expanded (virtual loss) are kept.
+
+        Returns:
+            int: The number of removed nodes
+        """
+        counter = itertools.count()
+        leaves = [
+            (node.value, next(counter), node)
+            for node in self._get_all_children()
+            if node.is_terminal
+        ]
+        excess = len(leaves) - max_frontier
+        heapq.heapify(leaves)
+        removed = 0
+        while excess > 0 and leaves:
+            _, _, leaf = heapq.heappop(leaves)
+            if leaf._is_solved or leaf.virtual_loss > 0:
+                continue
+            parent = leaf.parent
+            leaf._detach()
+            removed += 1
+            if parent is not self and parent.is_terminal:
+                heapq.heappush(leaves, (parent.value, next(counter), parent))
+            else:
+                excess -= 1
+        return removed
+
+    def release(self):
+        """Break the references of a finished tree so its memory is freed at once."""
+        index = self._index
+        for node in [self] + self._get_all_children():
+            node.children = []
+            node.parent = None
+            node.reflection = None
+            node._trajectory_ids = None
+            node._plain_trajectory_ids = None
+        index.arena.clear()
+        index.uct_heap.clear()
+        index.solutions.clear()
+        index.transpositions.clear()
+        index.root = None
+
+    def _detach(self):
+        """Remove this leaf from its parent and release what it references."""
+        parent = self.parent
+        parent.children.remove(self)
+        node, height_changed = parent, True
+        while node:
+            node._size -= 1
+            if height_changed:
+                height = 1 + max((child._height for child in node.children), default=0)
+                height_changed = height != node._height
+                node._height = height
             node = node.parent
-        # Reverse the final back-tracked trajectory to return in the correct order
-        return messages[::-1]  # root solution, reflection, child 1, ...
+        index = self._index
+        if (
+            self.fingerprint is not None
+            and index.transpositions.get(self.fingerprint) is self
+        ):
+            del index.transpositions[self.fingerprint]
+        for message_id in self._get_message_ids():
+            index.arena.release(message_id)
+        # Invalidates its entries in the UCT heap
+        self._uct_version += 1
+        self.parent = None
+        self.reflection = None
+        self._trajectory_ids = None
+        self._plain_trajectory_ids = None
 
     def _get_all_children(self):
         all_nodes = []
@@ -108,6 +415,11 @@ class Node:
 
     def get_best_solution(self):
         """Return the best solution from within the current sub-tree."""
+        if self.parent is None:
+            # Only nodes reflected as solved can be terminal solutions
+            solutions = [node for node in self._index.solutions if node.is_terminal]
+            best_node = max(solutions, key=lambda node: node.value, default=None)
+            return best_node if best_node is not None and best_node.value > 0 else self
         all_nodes = [self] + self._get_all_children()
         best_node = max(
             all_nodes,
@@ -122,6 +434,63 @@ class Node:
             parent._is_solved = True
             parent = parent.parent
 
+    def _refresh_uct(self):
+        """Re-index the nodes whose UCT changed: the path to the root and its children.
+
+        Visits, values and virtual losses only change along that path, and a UCT only
+        depends on the node itself and its parent, so nothing else goes stale.
+        """
+        node = self
+        while node:
+            for child in node.children:
+                self._push_uct(child)
+            node = node.parent
+
+    def _push_uct(self, node: "Node"):
+        index = self._index
+        node._uct_version += 1
+        heapq.heappush(
+            index.uct_heap,
+            (
+                -node.upper_confidence_bound(),
+                next(index.heap_counter),
+                node._uct_version,
+                node,
+            ),
+        )
+        # Drop superseded entries once they dominate the heap
+        if len(index.uct_heap) > 4 * index.root._size + 64:
+            index.uct_heap = [
+                entry for entry in index.uct_heap if entry[2] == entry[3]._uct_version
+            ]
+            heapq.heapify(index.uct_heap)
+
+    def _reindex_uct(self):
+        """Rebuild the UCT heap of the tree from scratch, e.g. after restoring statistics."""
+        index = self._index
+        index.uct_heap = []
+        for node in self._get_all_children():
+            self._push_uct(node)
+
+    def _pop_best_uct(self, excluded: Optional[Set[int]] = None) -> Optional["Node"]:
+        """Peek the node with the highest UCT from the root heap, skipping stale entries."""
+        heap = self._index.uct_heap
+        skipped = []
+        best = None
+        while heap:
+            entry = heap[0]
+            if entry[2] != entry[3]._uct_version:
+                heapq.heappop(heap)
+                continue
+            if excluded and id(entry[3]) in excluded:
+                skipped.append(heapq.heappop(heap))
+                continue
+            best = entry[3]
+            break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return best
+
 
 class TreeState:
     root: Node  # The full tree
@@ -130,3 +499,64 @@ class TreeState:
     def __init__(self, root: Node, input: str) -> None:
         self.root = root
         self.input = input
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the tree with its messages, reflections, visits and values.
+
+        Nodes are listed parents first, each referring to its parent by position and to
+        its messages by position in a shared message table.
+        """
+        nodes = [self.root] + self.root._get_all_children()
+        positions = {id(node): position for position, node in enumerate(nodes)}
+        messages: List[str] = []
+        message_positions: Dict[int, int] = {}
+        node_dicts = []
+        for node in nodes:
+            for message_id in node.message_ids:
+                if message_id not in message_positions:
+                    message_positions[message_id] = len(messages)
+                    messages.append(node.arena[message_id])
+            node_dicts.append(
+                {
+                    "parent": (
+                        positions[id(node.parent)] if node.parent is not None else None
+                    ),
+                    "messages": [
+                        message_positions[message_id] for message_id in node.message_ids
+                    ],
+                    "reflection": (
+                        node.reflection.model_dump() if node.reflection else None
+                    ),
+                    "visits": node.visits,
+                    "value": node.value,
+                    "fingerprint": node.fingerprint,
+                }
+            )
+        return {"input": self.input, "messages": messages, "nodes": node_dicts}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TreeState":
+        """Rebuild a tree serialized by to_dict, restoring the statistics of every node."""
+        messages = data["messages"]
+        nodes: List[Node] = []
+        for node_dict in data["nodes"]:
+            parent = (
+                nodes[node_dict["parent"]] if node_dict["parent"] is not None else None
+            )
+            reflection = node_dict["reflection"]
+            node = Node(
+                messages=[messages[position] for position in node_dict["messages"]],
+                reflection=Reflection(**reflection) if reflection else None,
+                parent=parent,
+                fingerprint=node_dict["fingerprint"],
+            )
+            if parent is not None:
+                parent.add_child(node)
+            nodes.append(node)
+        # Construction backpropagated the reflections again, restore the saved values
+        for node, node_dict in zip(nodes, data["nodes"]):
+            node.visits = node_dict["visits"]
+            node.value = node_dict["value"]
+        root = nodes[0]
+        root._reindex_uct()
+        return cls(root=root, input=data["input"])
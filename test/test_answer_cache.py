@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from storage.answer_cache import SemanticAnswerCache
+
+
+class ConstantEmbedder:
+    """Embeds every question alike, as a paraphrase or an entity swap might be."""
+
+    def run(self, text: str):
+        return {"embedding": [1.0, 0.0, 0.0, 0.0]}
+
+
+def get_cache() -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(embedding_dim=4)
+    cache.text_embedder = ConstantEmbedder()
+    cache.document_store = QdrantDocumentStore(
+        location=":memory:", index="answer_cache", embedding_dim=4, progress_bar=False
+    )
+    return cache
+
+
+class TestSemanticAnswerCache:
+    cypher = "MATCH (h:主机)-[:属于]->(s:系统 {name: 'A系统'}) RETURN h.name"
+
+    def test_entity_swap_misses(self):
+        cache = get_cache()
+        cache.set(
+            question="哪些主机属于A系统",
+            cypher=self.cypher,
+            answer="",
+            schema_hash="s1",
+        )
+        assert cache.get(question="哪些主机属于B系统", schema_hash="s1") is None
+        cached = cache.get(question="A系统有哪些主机", schema_hash="s1")
+        assert cached is not None and cached.cypher == self.cypher
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+
+    def test_schema_change_misses(self):
+        cache = get_cache()
+        cache.set(
+            question="哪些主机属于A系统",
+            cypher=self.cypher,
+            answer="",
+            schema_hash="s1",
+        )
+        assert cache.get(question="哪些主机属于A系统", schema_hash="s2") is None
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from agno.exceptions import StopAgentRun
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from utils.budget import (
+    Budget,
+    BudgetExceeded,
+    budget_tool_hook,
+    charge_db_query,
+    charge_run_response,
+    get_budget,
+    use_budget,
+)
+
+
+class TestBudget:
+    def test_unlimited_budget_is_never_exhausted(self):
+        budget = Budget()
+        budget.charge_llm(calls=100, tokens=10**6)
+        budget.charge_db_query(queries=100)
+        assert not budget.exhausted
+        assert budget.remaining_seconds is None
+
+    def test_limits(self):
+        budget = Budget(max_llm_calls=2, max_db_queries=1)
+        budget.charge_llm(calls=1, tokens=10)
+        assert not budget.exhausted
+        budget.charge_db_query()
+        assert budget.exhausted
+        with pytest.raises(BudgetExceeded):
+            budget.check()
+
+    def test_time_limit(self):
+        budget = Budget(time_limit=0.01)
+        budget.start()
+        time.sleep(0.02)
+        assert budget.exhausted
+        assert budget.remaining_seconds == 0.0
+
+    def test_use_budget_scopes_the_current_budget(self):
+        budget = Budget()
+        assert get_budget() is None
+        with use_budget(budget=budget):
+            assert get_budget() is budget
+            charge_db_query()
+        assert get_budget() is None
+        charge_db_query()
+        assert budget.db_queries == 1
+
+    def test_charge_run_response_includes_members(self):
+        member = SimpleNamespace(metrics={"total_tokens": [5]}, member_responses=[])
+        response = SimpleNamespace(
+            metrics={"total_tokens": [10, 20]}, member_responses=[member]
+        )
+        budget = Budget()
+        with use_budget(budget=budget):
+            charge_run_response(run_response=response)
+        assert budget.llm_calls == 3
+        assert budget.tokens == 35
+
+    def test_tool_hook_stops_the_run_when_exhausted(self):
+        budget = Budget(max_db_queries=1)
+        with use_budget(budget=budget):
+            assert budget_tool_hook("add", lambda a, b: a + b, {"a": 1, "b": 2}) == 3
+            budget.charge_db_query()
+            with pytest.raises(StopAgentRun):
+                budget_tool_hook("add", lambda a, b: a + b, {"a": 1, "b": 2})
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from workflow.compaction import OutputStore, TrajectoryCompactor, estimate_tokens
+
+
+class TestTrajectoryCompactor:
+    records = (
+        "```json\n" + "\n".join(f'{{"name": "主机{i}"}}' for i in range(200)) + "\n```"
+    )
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("主机名称") == 4
+        assert estimate_tokens("MATCH (n) RETURN n") == 5
+
+    def test_latest_step_is_verbatim(self):
+        compactor = TrajectoryCompactor(max_tokens=100000)
+        steps = [f"查询结果:\n{self.records}", f"最新结果:\n{self.records}"]
+        trace = compactor.compact(steps=steps)
+        assert trace.endswith(steps[-1])
+        assert trace.count(self.records) == 1
+
+    def test_large_outputs_behind_handles(self):
+        compactor = TrajectoryCompactor(max_tokens=100000)
+        trace = compactor.compact(steps=[f"查询结果:\n{self.records}", "生成cypher"])
+        handle = trace.split()[1]
+        assert handle.startswith("<output:")
+        assert compactor.store.read_output(handle) == self.records
+        assert "已过期" in OutputStore().read_output(handle)
+
+    def test_token_budget(self):
+        compactor = TrajectoryCompactor(max_tokens=400, step_tokens=50)
+        steps = [f"第{i}步 " + "分析" * 100 for i in range(10)]
+        trace = compactor.compact(steps=steps)
+        assert estimate_tokens(trace) <= 400 + 20
+        assert trace.startswith("[省略了最早的 6 步推理]")
+        assert trace.endswith(steps[-1])
+        assert "第6步" in trace and "第5步" not in trace
+
+    def test_oversized_latest_step(self):
+        compactor = TrajectoryCompactor(max_tokens=400)
+        trace = compactor.compact(steps=["生成cypher", f"最新结果:\n{self.records}"])
+        assert estimate_tokens(trace) <= 400
+        handle = trace.splitlines()[2].split()[0]
+        assert compactor.store.read_output(handle) == self.records
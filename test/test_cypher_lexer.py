@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from utils.cypher_lexer import (
+    extract_cypher,
+    parameterize_cypher,
+    string_literals,
+    tokenize,
+)
+
+
+class TestCypherLexer:
+    def test_tokenize_roundtrip(self):
+        cypher = "MATCH (n:系统组件:主机 {name: '数智信通'}) // comment\nRETURN n.`系统资源名称` LIMIT 3"
+        tokens = tokenize(cypher=cypher)
+        assert "".join(token.text for token in tokens) == cypher
+
+    def test_parameterize_literals(self):
+        query, parameters = parameterize_cypher(
+            cypher="MATCH (s:系统资源 {系统资源名称: '数智信通'}) WHERE s.id > 10 RETURN s LIMIT 25"
+        )
+        assert query == (
+            "MATCH (s:系统资源 {系统资源名称: $lit0}) WHERE s.id > $lit1 RETURN s LIMIT $lit2"
+        )
+        assert parameters == {"lit0": "数智信通", "lit1": 10, "lit2": 25}
+
+    def test_parameterize_same_structure(self):
+        query_0, _ = parameterize_cypher(cypher="MATCH (n {name: '数智信通'}) RETURN n")
+        query_1, _ = parameterize_cypher(cypher="MATCH (n {name: '智能运维'}) RETURN n")
+        assert query_0 == query_1
+
+    def test_keep_variable_length_hops(self):
+        query, parameters = parameterize_cypher(
+            cypher="MATCH p = (a)-[*1..5]-(b) WHERE a.name = 'A' RETURN p"
+        )
+        assert query == "MATCH p = (a)-[*1..5]-(b) WHERE a.name = $lit0 RETURN p"
+        assert parameters == {"lit0": "A"}
+
+    def test_keep_schema_commands(self):
+        cypher = "SHOW INDEXES"
+        assert parameterize_cypher(cypher=cypher) == (cypher, {})
+
+    def test_string_literals(self):
+        literals = string_literals(
+            cypher="MATCH (a {name: '数智信通'})--(b {name: \"智能运维\"}) "
+            "WHERE a.name = '数智信通' RETURN b LIMIT 5"
+        )
+        assert literals == ["数智信通", "智能运维"]
+
+    def test_extract_cypher_skips_result_block(self):
+        text = (
+            "```cypher\nMATCH (n:主机) RETURN n.name\n```\n\n"
+            '查询结果:\n```\n[{"n.name": "x"}]\n```'
+        )
+        assert extract_cypher(text=text) == "MATCH (n:主机) RETURN n.name"
+
+    def test_extract_cypher_unlabelled_block(self):
+        text = "```\nMATCH (n) RETURN n LIMIT 1\n```\n```json\n{}\n```"
+        assert extract_cypher(text=text) == "MATCH (n) RETURN n LIMIT 1"
+        assert extract_cypher(text="```\n[1, 2]\n```") is None
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+from textwrap import dedent
+
+import pytest
+
+from utils.cypher_parser import CypherParseError, check_cypher, parse_cypher
+
+
+class TestCypherParser:
+    def test_parse_match_return(self):
+        result = parse_cypher(cypher="MATCH (n:系统组件:主机) RETURN n LIMIT 3")
+        assert result.clauses == ["MATCH", "RETURN"]
+        assert "n" in result.variables
+
+    def test_parse_union(self):
+        cypher = dedent("""\
+            MATCH (n) WHERE (n.`中间件服务地址`) IS NOT NULL
+            RETURN DISTINCT "node" as entity, n.`中间件服务地址` AS `中间件服务地址` LIMIT 25
+            UNION ALL
+            MATCH ()-[r]-() WHERE (r.`中间件服务地址`) IS NOT NULL
+            RETURN DISTINCT "relationship" AS entity, r.`中间件服务地址` AS `中间件服务地址` LIMIT 25\
+            """)
+        assert check_cypher(cypher=cypher) is None
+
+    def test_parse_path(self):
+        cypher = dedent("""\
+            MATCH p = (a)-[*1..5]-(b)
+            WHERE a.name = '智能一体化运维支撑平台' AND b.name = '智能一体化运维支撑平台oracle主库生产环境数据源'
+            RETURN p, nodes(p) AS path_nodes, relationships(p) AS relationships\
+            """)
+        assert check_cypher(cypher=cypher) is None
+
+    def test_parse_expressions(self):
+        cypher = dedent("""\
+            MATCH (a)-[r]->(b)
+            WHERE NOT (a)-->(:X) AND EXISTS { (b)-->(c) } AND a.name STARTS WITH 'x'
+            WITH a, b, [x IN collect(b.name) WHERE x IS NOT NULL | toUpper(x)] AS names
+            CALL (a) { MATCH (a)--(m) RETURN count(m) AS degree }
+            RETURN a {.name, degree: degree}, names[0..2],
+                   reduce(s = 0, x IN names | s + size(x)) AS total,
+                   CASE WHEN a:Foo THEN 1 ELSE 0 END AS foo\
+            """)
+        assert check_cypher(cypher=cypher) is None
+
+    def test_unbalanced_brackets(self):
+        error = check_cypher(
+            cypher="MATCH (sys:系统资源 {系统资源名称: '数智信通'})--(relatedNodes) RETURN sys, relatedNodes)"
+        )
+        assert error is not None and "括号不匹配" in error
+
+    def test_undefined_variable(self):
+        with pytest.raises(CypherParseError) as e:
+            parse_cypher(
+                cypher="MATCH (sys:系统资源 {系统资源名称: '数智信通'})--(relatedNodes) RETURN sys, r, relatedNodes"
+            )
+        assert "`r`" in e.value.message
+
+    def test_unknown_clause(self):
+        error = check_cypher(cypher="MATCH (n) RETRUN n")
+        assert error is not None and "RETRUN" in error
+
+    def test_unaliased_with(self):
+        assert check_cypher(cypher="MATCH (n) WITH n.name RETURN n") is not None
+
+    def test_admin_command(self):
+        assert parse_cypher(cypher="SHOW INDEXES").is_admin_command
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from agent.reflector import Reflection
+from storage.cache import ReflectionCache
+
+
+class TestReflectionCache:
+    reflection = Reflection(plan="查询结果正确", score=8, end=True)
+
+    def test_memory_lru(self):
+        cache = ReflectionCache(max_size=2)
+        assert cache.get(input="问题", candidate="候选0") is None
+        for index in range(3):
+            cache.set(
+                input="问题", candidate=f"候选{index}", reflection=self.reflection
+            )
+        assert len(cache) == 2
+        assert cache.get(input="问题", candidate="候选0") is None
+        assert cache.get(input="问题", candidate="候选2") == self.reflection
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 2
+
+    def test_sqlite_backing(self):
+        db_file = os.path.join(tempfile.mkdtemp(), "reflection_cache.db")
+        cache = ReflectionCache(db_file=db_file)
+        cache.set(input="问题", candidate="候选", reflection=self.reflection)
+        reloaded = ReflectionCache(db_file=db_file)
+        assert reloaded.get(input="问题", candidate="候选") == self.reflection
+        other_model = ReflectionCache(db_file=db_file, namespace="other-model")
+        assert other_model.get(input="问题", candidate="候选") is None
+
+    def test_ttl(self):
+        cache = ReflectionCache(ttl=-1)
+        cache.set(input="问题", candidate="候选", reflection=self.reflection)
+        assert cache.get(input="问题", candidate="候选") is None
@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from utils.utils import get_validator
+from workflow.scorer import (
+    EMPTY_RESULT_SCORE,
+    EXPLAIN_ERROR_SCORE,
+    PARSE_ERROR_SCORE,
+    UNKNOWN_ENTITY_SCORE,
+    HeuristicScorer,
+)
+
+
+class TestScorer:
+    scorer = HeuristicScorer(validator=get_validator())
+
+    def test_no_cypher(self):
+        assert self.scorer.score(candidate="先确定问题中涉及的实体") is None
+
+    def test_parse_error(self):
+        heuristic = self.scorer.score(
+            candidate="```cypher\nMATCH (n:系统资源 RETURN n\n```"
+        )
+        assert heuristic.score == PARSE_ERROR_SCORE
+        assert self.scorer.is_rejected(heuristic)
+        print(heuristic.as_reflection())
+
+    def test_explain_error(self):
+        heuristic = self.scorer.score(
+            candidate="```cypher\nMATCH (n) RETURN n.name + 1 AS x, count(*) AS c ORDER BY m\n```"
+        )
+        assert heuristic.score <= EXPLAIN_ERROR_SCORE
+        assert self.scorer.is_rejected(heuristic)
+
+    def test_empty_result_unknown_entity(self):
+        heuristic = self.scorer.score(
+            candidate="```cypher\nMATCH (n:系统资源 {系统资源名称: '不存在的系统'}) RETURN n\n```"
+        )
+        assert heuristic.score == UNKNOWN_ENTITY_SCORE
+        assert heuristic.missing_entities == ["不存在的系统"]
+        assert self.scorer.is_rejected(heuristic)
+
+    def test_empty_result_known_entity(self):
+        # 有没有…: no rows can be the right answer, left to the reflector
+        heuristic = self.scorer.score(
+            candidate="```cypher\nMATCH (n:系统资源 {系统资源名称: '数智信通'})-[:不存在的关系]->(m) RETURN m\n```"
+        )
+        assert heuristic.score == EMPTY_RESULT_SCORE
+        assert not self.scorer.is_rejected(heuristic)
+
+    def test_passed(self):
+        heuristic = self.scorer.score(
+            candidate="```cypher\nMATCH (n:系统资源 {系统资源名称: '数智信通'}) RETURN n\n```"
+        )
+        assert not self.scorer.is_rejected(heuristic)
+        print(heuristic.to_dict())
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+import pytest
+
+from agent.reflector import Reflection
+from workflow.strategy import (
+    BeamStrategy,
+    GreedyStrategy,
+    LATSStrategy,
+    SingleShotStrategy,
+    get_strategy,
+)
+from workflow.tree import Node, TreeState
+
+
+class ScriptedWorkflow:
+    """Expands nodes with fixed scores, solving the question at a given depth."""
+
+    def __init__(self, solved_depth: int = 10):
+        self.solved_depth = solved_depth
+        self.expansions = 0
+        self.checkpoints = 0
+
+    async def aexpand_node(self, question, state, node, num):
+        self.expansions += 1
+        children = []
+        prefix = node.messages[-1] if node.messages else "root"
+        for index in range(num):
+            child = Node(
+                messages=[f"{prefix}.{index}"],
+                parent=node,
+                reflection=Reflection(
+                    plan="",
+                    score=9 - index,
+                    end=node.depth + 1 >= self.solved_depth and index == 0,
+                ),
+            )
+            node.add_child(child)
+            children.append(child)
+        return children
+
+    async def asave_checkpoint(self, state):
+        self.checkpoints += 1
+
+
+def search(strategy, workflow):
+    root = Node(messages=["0"], reflection=Reflection(plan="", score=3, end=False))
+    state = TreeState(root=root, input="问题")
+    state = asyncio.run(
+        strategy.search(workflow=workflow, question="问题", state=state)
+    )
+    return state, strategy.get_solution(state=state)
+
+
+class TestStrategy:
+    def test_get_strategy(self):
+        assert isinstance(get_strategy("lats"), LATSStrategy)
+        assert get_strategy("beam", search_depth=2).search_depth == 2
+        with pytest.raises(ValueError):
+            get_strategy("unknown")
+
+    def test_lats_respects_search_depth(self):
+        workflow = ScriptedWorkflow()
+        state, _ = search(LATSStrategy(search_depth=2, expand_num=2), workflow)
+        assert workflow.expansions == 2
+        assert state.root.height <= 3
+
+    def test_beam(self):
+        workflow = ScriptedWorkflow(solved_depth=3)
+        state, solution = search(
+            BeamStrategy(search_depth=3, expand_num=2, beam_width=2), workflow
+        )
+        assert state.root.is_solved
+        assert solution.reflection.end
+        assert workflow.expansions == 3
+
+    def test_greedy(self):
+        workflow = ScriptedWorkflow(solved_depth=4)
+        state, solution = search(GreedyStrategy(search_depth=5), workflow)
+        assert state.root.is_solved
+        assert solution.messages == ["0.0.0.0"]
+        assert workflow.expansions == 3
+
+    def test_single_shot(self):
+        workflow = ScriptedWorkflow()
+        state, solution = search(SingleShotStrategy(), workflow)
+        assert workflow.expansions == 0
+        assert solution is state.root
+
+    def test_max_frontier_bounds_the_tree(self):
+        for strategy in (
+            LATSStrategy(search_depth=4, expand_num=3, max_frontier=2),
+            GreedyStrategy(search_depth=4, expand_num=3, max_frontier=2),
+        ):
+            workflow = ScriptedWorkflow()
+            state, _ = search(strategy, workflow)
+            leaves = [
+                node for node in state.root._get_all_children() if not node.children
+            ]
+            assert len(leaves) <= 2
+            assert workflow.expansions == 4
+
+    def test_virtual_root(self):
+        workflow = ScriptedWorkflow()
+        root = Node(messages=[])
+        state = TreeState(root=root, input="问题")
+        asyncio.run(
+            workflow.aexpand_node(question="问题", state=state, node=root, num=3)
+        )
+        strategy = LATSStrategy(search_depth=1, expand_num=2)
+        asyncio.run(strategy.search(workflow=workflow, question="问题", state=state))
+        # The best initial branch is expanded and answers the unsolved search
+        assert len(root.children[0].children) == 2
+        solution = strategy.get_solution(state=state)
+        assert solution.get_trajectory(include_reflections=False) == ["root.0"]
+
+    def test_checkpoint_once_per_iteration(self):
+        workflow = ScriptedWorkflow()
+        strategy = LATSStrategy(search_depth=3, expand_num=2, parallel_leaves=2)
+        search(strategy, workflow)
+        # The later iterations expand two leaves each but checkpoint once
+        assert workflow.expansions == 5
+        assert workflow.checkpoints == 3
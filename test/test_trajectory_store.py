@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from storage.trajectory_store import SolvedTrajectoryStore
+
+
+class ConstantEmbedder:
+    def run(self, text: str):
+        return {"embedding": [1.0, 0.0, 0.0, 0.0]}
+
+
+class TestSolvedTrajectoryStore:
+    def test_search_current_schema(self):
+        store = SolvedTrajectoryStore(embedding_dim=4)
+        store.text_embedder = ConstantEmbedder()
+        store.document_store = QdrantDocumentStore(
+            location=":memory:",
+            index="solved_trajectories",
+            embedding_dim=4,
+            progress_bar=False,
+        )
+        store.add(
+            question="哪些主机属于A系统",
+            cypher="MATCH (h:主机) RETURN h",
+            trajectory=["查找实体", "```cypher\nMATCH (h:主机) RETURN h\n```"],
+            schema_hash="s1",
+        )
+        examples = store.search(question="哪些主机属于B系统", schema_hash="s1")
+        assert [example.question for example in examples] == ["哪些主机属于A系统"]
+        assert examples[0].trajectory[0] == "查找实体"
+        assert store.search(question="哪些主机属于B系统", schema_hash="s2") == []
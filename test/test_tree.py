@@ -0,0 +1,209 @@
+import os
+import random
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.abspath("../src"))
+
+from agent.reflector import Reflection
+from workflow.tree import Node, TreeState
+
+
+def build_tree():
+    root = Node(messages=["root"], reflection=Reflection(plan="", score=5, end=False))
+    for score in (9, 8, 2):
+        child = Node(
+            messages=[f"child {score}"],
+            parent=root,
+            reflection=Reflection(plan="", score=score, end=False),
+        )
+        root.add_child(child)
+    return root
+
+
+class TestTree:
+    def test_select_leaves_virtual_loss(self):
+        root = build_tree()
+        leaves = root.select_leaves(k=2)
+        assert len(leaves) == 2
+        assert len(set(id(leaf) for leaf in leaves)) == 2
+        assert root.virtual_loss == 2
+        for leaf in leaves:
+            leaf.remove_virtual_loss()
+        assert root.virtual_loss == 0
+        assert all(child.virtual_loss == 0 for child in root.children)
+
+    def test_virtual_loss_lowers_uct(self):
+        root = build_tree()
+        child = root.children[0]
+        uct = child.upper_confidence_bound()
+        child.add_virtual_loss()
+        assert child.upper_confidence_bound() < uct
+        child.remove_virtual_loss()
+        assert child.upper_confidence_bound() == uct
+
+    def test_incremental_statistics(self):
+        random.seed(0)
+        root = Node(
+            messages=["root"], reflection=Reflection(plan="", score=5, end=False)
+        )
+        nodes = [root]
+        for index in range(200):
+            parent = random.choice(nodes)
+            child = Node(
+                messages=[f"child {index}"],
+                parent=parent,
+                reflection=Reflection(
+                    plan="", score=random.randint(0, 10), end=random.random() < 0.05
+                ),
+            )
+            parent.add_child(child)
+            nodes.append(child)
+
+            all_nodes = root._get_all_children()
+            assert root.size == len(all_nodes) + 1
+            assert root.height == 1 + max(node.depth - 1 for node in all_nodes)
+            best_uct = max(node.upper_confidence_bound() for node in all_nodes)
+            assert root.best_child.upper_confidence_bound() == best_uct
+            best_value = max(
+                int(node.is_terminal and node.is_solved) * node.value
+                for node in [root] + all_nodes
+            )
+            if best_value > 0:
+                assert root.get_best_solution().value == best_value
+            else:
+                assert root.get_best_solution() is root
+
+    def test_trajectory_arena(self):
+        root = build_tree()
+        child = root.children[0]
+        grandchild = Node(
+            messages=["child 9"],
+            parent=child,
+            reflection=Reflection(plan="", score=9, end=True),
+        )
+        child.add_child(grandchild)
+        assert grandchild.get_trajectory(include_reflections=False) == [
+            "root",
+            "child 9",
+            "child 9",
+        ]
+        assert grandchild.get_trajectory() == [
+            "root",
+            root.reflection.as_message(),
+            "child 9",
+            child.reflection.as_message(),
+            "child 9",
+            grandchild.reflection.as_message(),
+        ]
+        # Repeated messages are stored once per tree
+        assert grandchild.message_ids == child.message_ids
+        assert not hasattr(grandchild, "__dict__")
+
+    def test_transposition_table(self):
+        root = Node(
+            messages=["root"],
+            reflection=Reflection(plan="", score=5, end=False),
+            fingerprint="root",
+        )
+        child = Node(
+            messages=["MATCH (n) RETURN n"],
+            parent=root,
+            reflection=Reflection(plan="", score=8, end=False),
+            fingerprint="match",
+        )
+        root.add_child(child)
+        assert root.find_transposition("match") is child
+        assert root.find_transposition("other") is None
+
+        child.revisit()
+        assert root.transposition_hits == 1
+        assert child.visits == 2
+        assert child.value == 0.8
+        assert root.visits == 3
+        assert root.size == 2
+
+    def test_prune_keeps_the_best_leaves(self):
+        root = build_tree()
+        best = root.children[0]
+        for score in (7, 1):
+            best.add_child(
+                Node(
+                    messages=[f"grandchild {score}"],
+                    parent=best,
+                    reflection=Reflection(plan="", score=score, end=False),
+                )
+            )
+        arena_size = len(root.arena)
+        assert root.size == 6
+
+        # Leaves: child 8, child 2, grandchild 7, grandchild 1
+        assert root.prune(max_frontier=2) == 2
+        assert [child.messages for child in root.children] == [
+            ["child 9"],
+            ["child 8"],
+        ]
+        assert [child.messages for child in best.children] == [["grandchild 7"]]
+        assert root.size == 4
+        assert root.height == 3
+        assert len(root.arena) < arena_size
+        # Pruned nodes never come back from the UCT heap
+        selected = root.select_leaves(k=10)
+        assert len(selected) == 3
+        assert all(not node.is_pruned for node in selected)
+
+    def test_prune_whole_branch_and_release(self):
+        root = build_tree()
+        weak = root.children[2]
+        weak.add_child(
+            Node(
+                messages=["grandchild 1"],
+                parent=weak,
+                reflection=Reflection(plan="", score=1, end=False),
+            )
+        )
+        assert root.prune(max_frontier=2) == 2
+        assert weak.is_pruned
+        assert len(root.children) == 2
+        assert root.height == 2
+
+        child = root.children[0]
+        root.release()
+        assert child.is_pruned
+        assert root.children == []
+        assert len(root.arena) == 0
+
+    def test_tree_state_round_trip(self):
+        root = build_tree()
+        best = root.children[0]
+        best.add_child(
+            Node(
+                messages=["child 9"],
+                parent=best,
+                reflection=Reflection(plan="", score=10, end=True),
+                fingerprint="solved",
+            )
+        )
+        data = TreeState(root=root, input="问题").to_dict()
+        # Repeated messages are stored once
+        assert data["messages"].count("child 9") == 1
+
+        state = TreeState.from_dict(data=yaml.safe_load(yaml.dump(data)))
+        restored = state.root
+        assert state.input == "问题"
+        assert restored.size == root.size
+        assert restored.height == root.height
+        assert restored.is_solved
+        assert restored.find_transposition("solved").reflection.end
+        for original, node in zip(
+            [root] + root._get_all_children(),
+            [restored] + restored._get_all_children(),
+        ):
+            assert node.messages == original.messages
+            assert node.visits == original.visits
+            assert node.value == original.value
+        assert restored.best_child.messages == root.best_child.messages
+        assert restored.get_best_solution().get_trajectory() == (
+            root.get_best_solution().get_trajectory()
+        )